@@ -5,14 +5,30 @@ from __future__ import division
 import numpy as np
 
 
-def cmdscale(D):
+def cmdscale(D, block_size=1024, dtype=None, k=None):
     """
     Classical multidimensional scaling (MDS)
 
     Parameters
     ----------
     D : (n, n) array
-        Symmetric distance matrix.
+        Symmetric distance matrix. May be a memory-mapped array, it is
+        only read block by block.
+
+    block_size : int
+        Number of rows of D read at a time.
+
+    dtype : float64 (default) or float32
+        Precision of B and of the eigendecomposition. Row means are
+        accumulated in float64 in either case.
+
+    k : int, optional
+        Number of leading dimensions wanted. When given, only the k
+        largest eigenpairs of B are computed with ARPACK (eigsh) and B is
+        never formed: each product B v double-centres the result of
+        multiplying D ** 2, block by block, so memory stays O(n k +
+        block_size n).  Without k the full n x n B is built in memory
+        and diagonalised densely.
 
     Returns
     -------
@@ -29,24 +45,69 @@ def cmdscale(D):
     # Number of points
     n = len(D)
 
-    # Centering matrix
-    H = np.eye(n) - np.ones((n, n)) / n
+    if k is not None and k < n - 1:
+        evals, evecs = _leading_eigenpairs(D, k, block_size, np.dtype(dtype or np.float64))
+        return _coordinates(evals, evecs, n)
+
+    # Squared distances, read in row blocks so that D may be a memmap
+    B = np.empty((n, n), dtype=dtype or np.float64)
+    for start in range(0, n, block_size):
+        B[start:start + block_size] = np.asarray(D[start:start + block_size]) ** 2
 
-    # YY^T
-    B = -H.dot(D ** 2).dot(H) / 2
+    # YY^T = -H D^2 H / 2 with H = I - 1/n, applied as in-place double
+    # centering instead of building the n x n centering matrix
+    row_mean = B.mean(axis=1, dtype=np.float64)
+    grand_mean = row_mean.mean()
+    row_mean = row_mean.astype(B.dtype)
+    B -= row_mean[:, np.newaxis]
+    B -= row_mean[np.newaxis, :]
+    B += grand_mean
+    B *= -0.5
 
     # Diagonalize
     evals, evecs = np.linalg.eigh(B)
 
+    return _coordinates(evals, evecs, n, k)
+
+
+def _leading_eigenpairs(D, k, block_size, dtype):
+    """
+    k largest eigenpairs of B = -H D^2 H / 2 without forming B.
+    """
+    from scipy.sparse.linalg import LinearOperator, eigsh
+
+    n = len(D)
+
+    def matmat(v):
+        v = np.asarray(v, dtype=dtype).reshape(n, -1)
+        u = v - v.mean(axis=0)
+        w = np.empty_like(u)
+        for start in range(0, n, block_size):
+            block = np.asarray(D[start:start + block_size], dtype=dtype)
+            w[start:start + block_size] = (block * block) @ u
+        w -= w.mean(axis=0)
+        return -0.5 * w
+
+    B = LinearOperator((n, n), matvec=matmat, matmat=matmat, dtype=dtype)
+    # fixed start vector for reproducible results; a constant vector
+    # would lie in the null space of H
+    v0 = np.random.default_rng(0).random(n).astype(dtype)
+    return eigsh(B, k=k, which='LA', v0=v0)
+
+
+def _coordinates(evals, evecs, n, k=None):
     # Sort by eigenvalue in descending order
     idx = np.argsort(evals)[::-1]
+    if k is not None:
+        idx = idx[:k]
     evals = evals[idx]
     evecs = evecs[:, idx]
 
-    # Compute the coordinates using positive-eigenvalued components only
-    w, = np.where(evals > 0)
-    L = np.diag(np.sqrt(evals[w]))
-    V = evecs[:, w]
-    Y = V.dot(L)
+    # Compute the coordinates using positive-eigenvalued components only.
+    # Eigenvalues below the rounding error of the decomposition are noise
+    # (and clearly so in float32), so they count as zero.
+    tol = max(evals[0], 0) * n * np.finfo(evals.dtype).eps
+    w, = np.where(evals > tol)
+    Y = evecs[:, w] * np.sqrt(evals[w])
 
-    return Y, evals[evals > 0]
+    return Y, evals[w]
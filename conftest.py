@@ -0,0 +1,25 @@
+import os
+
+import pytest
+
+import loaders
+
+N_ROWS = 200
+TEST_DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "testdata.txt")
+
+
+@pytest.fixture(scope="session")
+def data():
+    """
+    Pierwsze N_ROWS wierszy testdata.txt
+    """
+    df, _ = loaders.load_file(TEST_DATA, None)
+    return df.head(N_ROWS)
+
+
+@pytest.fixture(scope="session")
+def complete_data(data):
+    """
+    Kolumny cech bez brakujących wartości i powtórzonych wierszy
+    """
+    return data.dropna().drop_duplicates().drop(columns="death")
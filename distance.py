@@ -0,0 +1,165 @@
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy.spatial.distance import cdist
+
+import utils
+
+METRICS = ("euclidean", "cosine", "manhattan", "mahalanobis", "gower")
+
+# nazwy metryk w scipy.spatial.distance.cdist
+_CDIST_METRICS = {"euclidean": "euclidean", "cosine": "cosine", "manhattan": "cityblock",
+                  "mahalanobis": "mahalanobis"}
+
+BLOCK_SIZE = 1024
+
+
+def create_distance_memmap(n: int, path: str = None, dtype=np.float64) -> np.memmap:
+    """
+    Pusta macierz N x N na dysku, domyślnie w pliku tymczasowym
+    """
+    if path is None:
+        return np.memmap(tempfile.TemporaryFile(), dtype=dtype, mode="w+", shape=(n, n))
+    return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(n, n))
+
+
+def condensed_to_n(size: int) -> int:
+    """
+    Liczba punktów dla skondensowanej macierzy odległości o długości N(N-1)/2
+    """
+    n = int(round((1 + np.sqrt(1 + 8 * size)) / 2))
+    if n * (n - 1) // 2 != size:
+        raise ValueError(f"{size} is not a valid condensed distance matrix size")
+    return n
+
+
+def expand_condensed(condensed: np.ndarray, path: str = None) -> np.memmap:
+    """
+    Rozwinięcie skondensowanej macierzy do pełnej N x N, wiersz po wierszu
+    """
+    n = condensed_to_n(len(condensed))
+    out = create_distance_memmap(n, path)
+    j = np.arange(n)
+    for i in range(n):
+        # indeks pary (min(i, j), max(i, j)) w postaci skondensowanej
+        low = np.minimum(i, j)
+        high = np.maximum(i, j)
+        index = n * low - low * (low + 1) // 2 + high - low - 1
+        row = condensed[np.where(j == i, 0, index)]
+        out[i] = row
+        out[i, i] = 0.0
+    out.flush()
+    return out
+
+
+def load_distance_matrix(filepath: str) -> np.ndarray:
+    """
+    Wczytanie gotowej macierzy odległości.
+    Pliki .npy są mapowane do pamięci, postać skondensowana (wektor) jest rozwijana do memmapy,
+    pozostałe pliki są czytane jako tekst (pełna macierz lub wektor skondensowany).
+    """
+    if filepath.endswith(".npy"):
+        matrix = np.load(filepath, mmap_mode="r")
+    else:
+        matrix = np.loadtxt(filepath, delimiter=None if filepath.endswith(".txt") else ",", ndmin=1)
+
+    if matrix.ndim == 1 or min(matrix.shape) == 1:
+        return expand_condensed(np.asarray(matrix).ravel())
+    if matrix.ndim != 2 or matrix.shape[0] != matrix.shape[1]:
+        raise ValueError(f"Distance matrix must be square, got shape {matrix.shape}")
+    return matrix
+
+
+def subset_distance_matrix(matrix: np.ndarray, positions: np.ndarray, path: str = None,
+                           block_size: int = BLOCK_SIZE) -> np.memmap:
+    """
+    Podmacierz odległości dla wybranych wierszy (w podanej kolejności),
+    kopiowana blokami wierszy do nowej memmapy
+    """
+    out = create_distance_memmap(len(positions), path, matrix.dtype)
+    for start in range(0, len(positions), block_size):
+        out[start:start + block_size] = np.asarray(matrix[positions[start:start + block_size]])[:, positions]
+    out.flush()
+    return out
+
+
+def _fill_blocks(out: np.ndarray, compute_block, block_size: int, n_jobs: int):
+    """
+    Wypełnienie macierzy blokami wierszy w puli wątków
+    Przekątna jest zerowana, bo np. odległość kosinusowa daje tam szum zaokrągleń (~1e-16)
+    """
+    n = out.shape[0]
+
+    def task(start):
+        stop = min(start + block_size, n)
+        block = compute_block(start, stop)
+        block[np.arange(stop - start), np.arange(start, stop)] = 0.0
+        out[start:stop] = block
+
+    with ThreadPoolExecutor(max_workers=n_jobs or os.cpu_count()) as executor:
+        list(executor.map(task, range(0, n, block_size)))
+    if isinstance(out, np.memmap):
+        out.flush()
+    return out
+
+
+def compute_distance_matrix(x: np.ndarray, metric: str = "euclidean", path: str = None,
+                            block_size: int = BLOCK_SIZE, n_jobs: int = None, dtype=np.float64) -> np.ndarray:
+    """
+    Macierz odległości między wierszami x, liczona blokami i zapisywana od razu do memmapy
+    dtype - typ zapisanej macierzy (np.float32 zmniejsza ją o połowę)
+    """
+    if metric not in _CDIST_METRICS:
+        raise ValueError(f"Unknown metric: {metric}")
+    if metric == "mahalanobis":
+        # odległość Mahalanobisa to odległość euklidesowa po wybieleniu danych:
+        # VI = L L^T, więc (u - v) VI (u - v)^T = |(u - v) L|^2. L z eigh kowariancji,
+        # kierunki o zerowej wariancji są pomijane jak w pseudoodwrotności
+        evals, evecs = np.linalg.eigh(np.atleast_2d(np.cov(x, rowvar=False)))
+        keep = evals > evals.max() * len(evals) * np.finfo(np.float64).eps
+        x = np.asarray(x, dtype=np.float64) @ (evecs[:, keep] / np.sqrt(evals[keep]))
+        metric = "euclidean"
+
+    out = create_distance_memmap(len(x), path, dtype)
+    return _fill_blocks(out, lambda start, stop: cdist(x[start:stop], x, _CDIST_METRICS[metric]),
+                        block_size, n_jobs)
+
+
+def gower_distance_matrix(df: pd.DataFrame, path: str = None, block_size: int = BLOCK_SIZE,
+                          n_jobs: int = None, dtype=np.float64) -> np.ndarray:
+    """
+    Odległość Gowera dla danych mieszanych: kolumny numeryczne przez rozstęp,
+    pozostałe jako zgodność kategorii. Brakujące wartości nie wchodzą do średniej.
+    """
+    numerical_columns = utils.get_numerical_columns(df)
+    categorical_columns = [col for col in df.columns if col not in numerical_columns]
+
+    numeric = df[numerical_columns].to_numpy(dtype=np.float64)
+    ranges = np.nanmax(numeric, axis=0) - np.nanmin(numeric, axis=0) if numerical_columns else np.ones(0)
+    ranges[ranges == 0] = 1.0
+    numeric = numeric / ranges
+    codes = np.column_stack([pd.factorize(df[col])[0] for col in categorical_columns]) \
+        if categorical_columns else np.empty((len(df), 0), dtype=np.int64)
+
+    def compute_block(start, stop):
+        total = np.zeros((stop - start, len(df)))
+        weight = np.zeros((stop - start, len(df)))
+        for j in range(numeric.shape[1]):
+            diff = np.abs(numeric[start:stop, j, None] - numeric[None, :, j])
+            valid = ~np.isnan(diff)
+            total += np.where(valid, diff, 0.0)
+            weight += valid
+        for j in range(codes.shape[1]):
+            left = codes[start:stop, j, None]
+            right = codes[None, :, j]
+            valid = (left >= 0) & (right >= 0)  # factorize oznacza braki jako -1
+            total += valid & (left != right)
+            weight += valid
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(weight > 0, total / weight, 0.0)
+
+    out = create_distance_memmap(len(df), path, dtype)
+    return _fill_blocks(out, compute_block, block_size, n_jobs)
@@ -0,0 +1,144 @@
+import weakref
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+import utils
+
+# obsługa brakujących wartości: usunięcie wierszy albo uzupełnienie średnią kolumny
+MISSING_POLICIES = ("drop", "impute")
+
+
+class FeatureMatrix:
+    """
+    Macierz cech (float64 lub float32, C-contiguous) w pamięci współdzielonej.
+    Ta sama tablica trafia do PCA, Sammona i MDS, a procesy robocze
+    mogą ją podłączyć po nazwie przez attach().
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: List[str], skipped: List[str], standardize: bool,
+                 missing: str = "drop", dtype=np.float64):
+        if missing not in MISSING_POLICIES:
+            raise ValueError(f"Unknown missing value policy: {missing}")
+        self.source = df
+        self.columns = columns
+        self.skipped = skipped
+        self.standardize = standardize
+        self.missing = missing
+        # wyniki PCA dla tej macierzy (utils.get_pca), używane np. do inicjalizacji Sammona
+        self.pca_scores = None
+
+        # pozycje wierszy bez braków (None gdy macierz zawiera wszystkie wiersze)
+        complete = np.ones(len(df), dtype=bool)
+        for col in columns:
+            complete &= df[col].notna().to_numpy()
+        self.n_incomplete = int(len(df) - np.count_nonzero(complete))
+        self.rows = np.flatnonzero(complete) if missing == "drop" and self.n_incomplete else None
+
+        shape = (len(df) if self.rows is None else len(self.rows), len(columns))
+        dtype = np.dtype(dtype)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * dtype.itemsize, 1))
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self._shm.buf)
+        # mapowanie jest zamykane dopiero, gdy znikną wszystkie widoki tablicy
+        weakref.finalize(self.array, self._shm.close)
+
+        # jedna konwersja, kolumna po kolumnie prosto do pamięci współdzielonej
+        for j, col in enumerate(columns):
+            values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            self.array[:, j] = values if self.rows is None else values[self.rows]
+
+        if missing == "impute" and self.n_incomplete:
+            rows, cols = np.nonzero(np.isnan(self.array))
+            self.array[rows, cols] = np.nanmean(self.array, axis=0, dtype=np.float64)[cols]
+
+        if standardize:
+            mean = self.array.mean(axis=0, dtype=np.float64)
+            std = self.array.std(axis=0, dtype=np.float64)
+            std[std == 0] = 1.0
+            self.array -= mean
+            self.array /= std
+
+    def align(self, series: pd.Series) -> pd.Series:
+        """
+        Wiersze kolumny (np. docelowej) odpowiadające wierszom macierzy
+        """
+        return series if self.rows is None else series.iloc[self.rows]
+
+    @property
+    def spec(self) -> Tuple[str, Tuple[int, int], str]:
+        """
+        Opis potrzebny do podłączenia macierzy w innym procesie
+        """
+        return self._shm.name, self.array.shape, self.array.dtype.str
+
+    def close(self):
+        """
+        Zwolnienie pamięci współdzielonej. Nazwa segmentu jest usuwana od razu,
+        a sama pamięć zostaje zmapowana, dopóki istnieją widoki tablicy.
+        Obliczenia w tle trzymają więc referencję do array (a nie tylko do macierzy),
+        bo cache może zwolnić macierz w trakcie obliczeń.
+        """
+        if self._shm is None:
+            return
+        self._shm.unlink()
+        self._shm = None
+        self.array = None
+
+
+def attach(spec: Tuple[str, Tuple[int, int], str]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    """
+    Podłączenie macierzy cech w procesie roboczym (bez kopiowania).
+    Zwrócony obiekt SharedMemory trzeba zamknąć po zakończeniu pracy.
+    """
+    name, shape, dtype = spec
+    shm = shared_memory.SharedMemory(name=name)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+class FeatureCache:
+    """
+    Pamięć podręczna macierzy cech, klucz to zbiór danych, wybór kolumn i standaryzacja.
+    Każde sortowanie, filtr czy krok przekształceń daje nową ramkę, więc pamiętanych jest
+    tylko max_size ostatnio używanych macierzy, starsze są zwalniane.
+    """
+
+    def __init__(self, max_size: int = 4):
+        self.max_size = max_size
+        self._matrices = OrderedDict()
+
+    def get(self, df: pd.DataFrame, columns: List[str] = None, exclude: List[str] = (),
+            standardize: bool = False, missing: str = "drop", dtype=np.float64) -> FeatureMatrix:
+        """
+        Zwraca macierz cech, kolumny nienumeryczne są pomijane (lista w FeatureMatrix.skipped)
+        missing - "drop" usuwa wiersze z brakami, "impute" uzupełnia je średnią kolumny
+        dtype - np.float64 albo np.float32 (tryb o połowę mniejszej pamięci)
+        """
+        numerical_columns = utils.get_numerical_columns(df)
+        if columns is None:
+            columns = [col for col in df.columns if col not in exclude]
+            skipped = [col for col in columns if col not in numerical_columns]
+            columns = [col for col in columns if col in numerical_columns]
+        else:
+            skipped = [col for col in columns if col not in numerical_columns]
+            if skipped:
+                raise ValueError(f"Non-numerical columns: {', '.join(map(str, skipped))}")
+
+        key = (id(df), tuple(columns), standardize, missing, np.dtype(dtype).str)
+        matrix = self._matrices.get(key)
+        if matrix is None:  # macierz trzyma referencję do ramki, więc id(df) się nie powtórzy
+            matrix = FeatureMatrix(df, columns, skipped, standardize, missing, dtype)
+            self._matrices[key] = matrix
+            while len(self._matrices) > self.max_size:
+                _, evicted = self._matrices.popitem(last=False)
+                evicted.close()
+        else:
+            self._matrices.move_to_end(key)
+        return matrix
+
+    def clear(self):
+        for matrix in self._matrices.values():
+            matrix.close()
+        self._matrices = OrderedDict()
@@ -0,0 +1,158 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+SUPPORTED_EXTENSIONS = (".csv", ".json", ".txt")
+
+# wartości traktowane jako brakujące przy konwersji na liczby
+NA_VALUES = ("", "NA", "N/A", "NaN", "nan", "null", "NULL", "None", ".", "?", "-")
+
+
+def load_json(filepath: str) -> Union[pd.DataFrame, None]:
+    """
+    Ładowanie pliku json
+    """
+    with open(filepath, 'r', encoding="latin-1") as f:
+        json_dict = json.load(f)
+    json_dict = json_dict["feeds"]
+    return json_dict
+
+
+def load_text(filepath: str, delimiter: str) -> List[List[str]]:
+    """
+    Wczytywanie pliku txt z możliwością wyboru separatora
+    """
+    if delimiter == "":
+        delimiter = None
+    with open(filepath, 'r', encoding="latin-1") as f:
+        text_list = f.read().splitlines()
+
+    text_list = [line.split(delimiter) for line in text_list]
+    return text_list
+
+
+def coerce_column(series: pd.Series) -> Tuple[pd.Series, int]:
+    """
+    Wektorowa konwersja kolumny na liczby, oznaczenia braków danych (NA_VALUES) stają się NaN.
+    Kolumna zostaje tekstowa, gdy choć jedna komórka nie jest liczbą ani brakiem danych.
+    Zwraca kolumnę i liczbę komórek zamienionych na NaN.
+    """
+    if pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        return series, 0
+    parsed = pd.to_numeric(series, errors="coerce")
+    text = series.astype("string").str.strip()
+    missing = series.isna().to_numpy() | text.isin(NA_VALUES).to_numpy(dtype=bool, na_value=True)
+    lost = parsed.isna().to_numpy() & ~series.isna().to_numpy()
+    # np. "A1" w kolumnie liczb to prawdziwy tekst, nie brak danych
+    if np.any(lost & ~missing) or parsed.notna().sum() == 0:
+        return series, 0
+    return parsed, int(np.count_nonzero(lost))
+
+
+def coerce_numeric(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Konwersja kolumn tekstowych na liczby z NaN w miejscu brakujących wartości.
+    Zwraca ramkę i raport: kolumna -> liczba komórek zamienionych na NaN.
+    """
+    report = {}
+    for col in df.columns:
+        converted, bad = coerce_column(df[col])
+        if converted is not df[col]:
+            df[col] = converted
+            if bad:
+                report[col] = bad
+    return df, report
+
+
+def load_file(filepath: str, delimiter: str = None) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Wczytanie jednego pliku csv, json lub txt do ramki danych
+    Zwraca ramkę i raport konwersji na liczby (patrz coerce_numeric)
+    """
+    if filepath.endswith(".csv"):
+        # braki rozpoznaje coerce_numeric, tak samo jak dla plików txt, więc trafiają do raportu
+        df = pd.read_csv(filepath, encoding="latin-1", keep_default_na=False)
+    elif filepath.endswith(".json"):
+        df = pd.DataFrame(load_json(filepath))
+    elif filepath.endswith(".txt"):
+        # plik txt z separatorem
+        text_list = load_text(filepath, delimiter)
+        df = pd.DataFrame(text_list[1:], columns=text_list[0])
+    else:
+        raise ValueError(f"Unsupported file type: {filepath}")
+    # konwersja danych na typ numerycny
+    return coerce_numeric(df)
+
+
+def _column_dtype(dtypes: List[np.dtype], complete: bool) -> np.dtype:
+    """
+    Wspólny typ kolumny ze wszystkich plików, complete=False gdy kolumny brakuje w którymś pliku
+    """
+    if all(pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) for dtype in dtypes):
+        dtype = np.result_type(*dtypes)
+        if not complete and dtype.kind in "iu":
+            dtype = np.dtype(np.float64)  # brakujące wartości jako NaN
+        return dtype
+    return np.dtype(object)
+
+
+def concat_frames(frames: List[pd.DataFrame], source_names: List[str] = None,
+                  source_column: str = None) -> pd.DataFrame:
+    """
+    Złączenie ramek o (być może) różnych kolumnach do wcześniej zaalokowanych kolumn,
+    każda wartość jest kopiowana tylko raz
+    """
+    columns = []
+    for frame in frames:
+        columns.extend(col for col in frame.columns if col not in columns)
+    if source_column in columns:
+        raise ValueError(f"Column {source_column} already exists in the data")
+    lengths = [len(frame) for frame in frames]
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+
+    data = {}
+    for col in columns:
+        present = [frame[col].dtype for frame in frames if col in frame.columns]
+        dtype = _column_dtype(present, complete=len(present) == len(frames))
+        values = np.empty(offsets[-1], dtype=dtype)
+        for frame, start, stop in zip(frames, offsets[:-1], offsets[1:]):
+            if col in frame.columns:
+                values[start:stop] = frame[col].to_numpy(dtype=dtype)
+            else:
+                values[start:stop] = np.nan if dtype.kind == "f" else None
+        data[col] = values
+
+    if source_column:
+        codes = np.repeat(np.arange(len(frames)), lengths)
+        data[source_column] = pd.Categorical.from_codes(codes, categories=source_names)
+    return pd.DataFrame(data, copy=False)
+
+
+def load_shards(filepaths: List[str], delimiter: str = None, source_column: str = None,
+                max_workers: int = None, processes: bool = False) -> Tuple[pd.DataFrame, Dict[str, int]]:
+    """
+    Równoległe wczytanie wielu plików (csv, json, txt) i złączenie ich w jedną ramkę.
+    source_column - nazwa kolumny z nazwą pliku źródłowego (opcjonalnie)
+    processes - pula procesów zamiast wątków
+    Zwraca ramkę i łączny raport konwersji na liczby
+    """
+    executor_class = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor_class(max_workers=max_workers or os.cpu_count()) as executor:
+        loaded = list(executor.map(load_file, filepaths, [delimiter] * len(filepaths)))
+    frames = [frame for frame, _ in loaded]
+
+    source_names = [os.path.basename(filepath) for filepath in filepaths]
+    if len(set(source_names)) != len(source_names):
+        source_names = list(filepaths)
+    df = concat_frames(frames, source_names, source_column)
+
+    # kolumny liczbowe tylko w części plików trzeba przekonwertować jeszcze raz
+    df, report = coerce_numeric(df)
+    for _, shard_report in loaded:
+        for col, bad in shard_report.items():
+            report[col] = report.get(col, 0) + bad
+    return df, report
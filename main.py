@@ -1,5 +1,5 @@
-﻿import json
-import os
+﻿import os
+import queue
 import tkinter as tk
 from tkinter import filedialog
 from tkinter import simpledialog, messagebox
@@ -9,35 +9,17 @@ from typing import Union, List
 import numpy as np
 import pandas as pd
 
+import distance
+import features
+import loaders
+import pipeline
+import progressive
 import utils
 import sammon
 
 BASE_DIR = os.getcwd()
 
 
-def load_json(filepath: str) -> Union[pd.DataFrame, None]:
-    """
-    Ładowanie pliku json
-    """
-    with open(filepath, 'r', encoding="latin-1") as f:
-        json_dict = json.load(f)
-    json_dict = json_dict["feeds"]
-    return json_dict
-
-
-def load_text(filepath: str, delimiter: str) -> List[List[str]]:
-    """
-    Wczytywanie pliku txt z możliwością wyboru separatora
-    """
-    if delimiter == "":
-        delimiter = None
-    with open(filepath, 'r', encoding="latin-1") as f:
-        text_list = f.read().splitlines()
-
-    text_list = [line.split(delimiter) for line in text_list]
-    return text_list
-
-
 class DialogWindow(tk.Toplevel):
     def __init__(self, parent, choices: List, display_label: str, title: str):
         super().__init__(parent)
@@ -175,13 +157,143 @@ class AcceptPCAInputs(tk.Toplevel):
         return self.result
 
 
+class AcceptFilterInputs(tk.Toplevel):
+    def __init__(self, parent, title: str, columns: List):
+        super().__init__(parent)
+        self.transient(parent)
+        if title:
+            self.title(title)
+        self.parent = parent
+        self.result = None
+        self.columns = columns
+        parent.eval(f'tk::PlaceWindow {str(self)} center')
+        self.body()
+        self.grab_set()
+        self.focus_set()
+        self.wait_window(self)
+
+    def body(self):
+        # kolumna
+        self.label_column = ttk.Label(self, text="Column:")
+        self.label_column.grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.column_list = ttk.Combobox(self, values=self.columns, state="readonly")
+        self.column_list.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        self.column_list.current(0)
+
+        # operator
+        self.label_operator = ttk.Label(self, text="Operator:")
+        self.label_operator.grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        self.operator_list = ttk.Combobox(self, values=utils.FILTER_OPERATORS, state="readonly")
+        self.operator_list.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
+        self.operator_list.current(0)
+
+        # wartość, dla "between" dwie wartości oddzielone przecinkiem
+        self.label_value = ttk.Label(self, text="Value (low, high for between):")
+        self.label_value.grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        self.entry_value = ttk.Entry(self)
+        self.entry_value.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
+
+        # przyciski OK i anuluj
+        self.button_ok = ttk.Button(self, text="OK", command=self.ok)
+        self.button_ok.grid(row=3, column=0, padx=5, pady=5, sticky="w")
+
+        self.button_cancel = ttk.Button(self, text="Cancel", command=self.cancel)
+        self.button_cancel.grid(row=3, column=1, padx=5, pady=5, sticky="e")
+
+        self.entry_value.focus()
+
+    def ok(self):
+        self.result = (self.column_list.get(), self.operator_list.get(), self.entry_value.get())
+        self.destroy()
+
+    def cancel(self):
+        self.result = None
+        self.destroy()
+
+    def get_result(self):
+        return self.result
+
+
+class AcceptTransformInputs(tk.Toplevel):
+    def __init__(self, parent, title: str, can_replace: bool):
+        super().__init__(parent)
+        self.transient(parent)
+        if title:
+            self.title(title)
+        self.parent = parent
+        self.result = None
+        self.can_replace = can_replace
+        parent.eval(f'tk::PlaceWindow {str(self)} center')
+        self.body()
+        self.grab_set()
+        self.focus_set()
+        self.wait_window(self)
+
+    def body(self):
+        # rodzaj kroku
+        self.label_step = ttk.Label(self, text="Step:")
+        self.label_step.grid(row=0, column=0, padx=5, pady=5, sticky="w")
+        self.step_list = ttk.Combobox(self, values=pipeline.STEP_TYPES, state="readonly")
+        self.step_list.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
+        self.step_list.current(0)
+
+        # kolumny, puste pole to wszystkie kolumny numeryczne
+        self.label_columns = ttk.Label(self, text="Columns (comma separated, empty for all numerical):")
+        self.label_columns.grid(row=1, column=0, padx=5, pady=5, sticky="w")
+        self.entry_columns = ttk.Entry(self)
+        self.entry_columns.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
+
+        # parametr kroku
+        _text = "Parameter (scale: standard/minmax, log: offset, impute: mean/median, filter: operator value):"
+        self.label_param = ttk.Label(self, text=_text, wraplength=300)
+        self.label_param.grid(row=2, column=0, padx=5, pady=5, sticky="w")
+        self.entry_param = ttk.Entry(self)
+        self.entry_param.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
+
+        # zastąpienie ostatniego kroku zamiast dodania nowego
+        self.replace_last = tk.BooleanVar(value=False)
+        self.check_replace = ttk.Checkbutton(self, text="Replace last step", variable=self.replace_last)
+        self.check_replace.grid(row=3, column=0, columnspan=2, padx=5, pady=5, sticky="w")
+        if not self.can_replace:
+            self.check_replace.state(["disabled"])
+
+        # przyciski OK i anuluj
+        self.button_ok = ttk.Button(self, text="OK", command=self.ok)
+        self.button_ok.grid(row=4, column=0, padx=5, pady=5, sticky="w")
+
+        self.button_cancel = ttk.Button(self, text="Cancel", command=self.cancel)
+        self.button_cancel.grid(row=4, column=1, padx=5, pady=5, sticky="e")
+
+        self.step_list.focus()
+
+    def ok(self):
+        self.result = (self.step_list.get(), self.entry_columns.get(), self.entry_param.get(),
+                       self.replace_last.get())
+        self.destroy()
+
+    def cancel(self):
+        self.result = None
+        self.destroy()
+
+    def get_result(self):
+        return self.result
+
+
 class MainApplication(tk.Tk):
     def __init__(self, parent=None, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
         self.parent = parent
         self.data = None
+        self.view = None
+        # przekształcenia wykonywane przed analizami
+        self.pipeline = pipeline.Pipeline()
+        # macierze cech współdzielone przez PCA i Sammona
+        self.features = features.FeatureCache()
+        # obliczenia na próbkach w tle (tryb progresywny)
+        self.progressive_run = None
 
         self.init_ui()
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
 
         frames = [self,
                   self.top_frame,
@@ -238,6 +350,16 @@ class MainApplication(tk.Tk):
         self.button_export_data = ttk.Button(self.top_left_frame, text="Export Data", command=self.export_data)
         self.button_export_data.grid(row=0, column=1)
 
+        self.button_load_shards = ttk.Button(self.top_left_frame, text="Load Shards", command=self.load_shards)
+        self.button_load_shards.grid(row=0, column=2)
+
+        # przyciski filtrowania tabeli
+        self.button_filter = ttk.Button(self.top_left_frame, text="Filter", command=self.filter_data)
+        self.button_filter.grid(row=1, column=0)
+
+        self.button_clear_filter = ttk.Button(self.top_left_frame, text="Clear Filter", command=self.clear_filter)
+        self.button_clear_filter.grid(row=1, column=1)
+
         self.top_middle_frame = tk.Frame(self.top_frame)
         self.top_middle_frame.grid(row=0, column=1, sticky="new", padx=5, pady=5)
         # przyciski avg, med, stdev
@@ -250,6 +372,17 @@ class MainApplication(tk.Tk):
         self.button_stdev = ttk.Button(self.top_middle_frame, text="Stdev", command=self.stdev)
         self.button_stdev.grid(row=0, column=2)
 
+        # przyciski przekształceń danych
+        self.button_transform = ttk.Button(self.top_middle_frame, text="Transform", command=self.add_transform)
+        self.button_transform.grid(row=1, column=0)
+
+        self.button_undo_transform = ttk.Button(self.top_middle_frame, text="Undo Step", command=self.undo_transform)
+        self.button_undo_transform.grid(row=1, column=1)
+
+        self.button_clear_transform = ttk.Button(self.top_middle_frame, text="Clear Steps",
+                                                 command=self.clear_transforms)
+        self.button_clear_transform.grid(row=1, column=2)
+
         self.top_right_frame = tk.Frame(self.top_frame)
         self.top_right_frame.grid(row=0, column=2, sticky="new", padx=5, pady=5)
 
@@ -260,6 +393,19 @@ class MainApplication(tk.Tk):
         self.button_sammon = ttk.Button(self.top_right_frame, text="Sammon", command=self.sammon)
         self.button_sammon.grid(row=0, column=1)
 
+        # tryb progresywny: najpierw wynik dla próbki, potem dla pełnych danych
+        self.progressive = tk.BooleanVar(value=False)
+        self.check_progressive = ttk.Checkbutton(self.top_right_frame, text="Progressive", variable=self.progressive)
+        self.check_progressive.grid(row=1, column=0)
+
+        self.button_cancel = ttk.Button(self.top_right_frame, text="Cancel", command=self.cancel_calculation)
+        self.button_cancel.grid(row=1, column=1)
+
+        # obliczenia w float32: połowa pamięci dla macierzy N x N
+        self.float32 = tk.BooleanVar(value=False)
+        self.check_float32 = ttk.Checkbutton(self.top_right_frame, text="Float32", variable=self.float32)
+        self.check_float32.grid(row=2, column=0)
+
     def add_colors(self):
         
         pass
@@ -298,6 +444,12 @@ class MainApplication(tk.Tk):
         """
         # czyszczenie tabeli
         self.treeview.delete(*self.treeview.get_children())
+        # macierze cech poprzednich danych są już nieaktualne
+        self.cancel_calculation(wait=True)
+        self.features.clear()
+        # nowy widok (sortowanie i filtrowanie) i przekształcenia dla wczytanych danych
+        self.view = utils.DataView(self.data)
+        self.pipeline = pipeline.Pipeline()
         # dodanie danych do tabeli
 
         # ----- konfig kolumn -----
@@ -310,11 +462,199 @@ class MainApplication(tk.Tk):
         for i in range(len(headers)):
             header_text = headers[i]
             self.treeview.column(header_text, anchor="center", width=100)
-            self.treeview.heading(header_text, text=headers[i], anchor="center")
+            self.treeview.heading(header_text, text=headers[i], anchor="center",
+                                  command=lambda col=header_text: self.sort_by(col))
+
+        # insert data into table, identyfikator wiersza to jego pozycja w ramce
+        for position, row in enumerate(self.data.itertuples(index=False)):
+            self.treeview.insert("", "end", iid=str(position), values=list(row))
 
-        # insert data into table
-        for row in self.data.iterrows():
-            self.treeview.insert("", "end", values=row[1].tolist())
+    def refresh_view(self):
+        """
+        Przestawienie wierszy tabeli zgodnie z widokiem, bez ponownego wstawiania danych
+        """
+        self.treeview.detach(*self.treeview.get_children())
+        for position in self.view.positions():
+            self.treeview.move(str(position), "", "end")
+
+        # strzałka przy kolumnie sortowania
+        for header_text in self.data.columns:
+            text = header_text
+            if header_text == self.view.sort_column:
+                text += " \u25b2" if self.view.ascending else " \u25bc"
+            self.treeview.heading(header_text, text=text)
+
+        if self.view.filters:
+            self.label_show_calculations.config(text=f"Showing {len(self.view.positions())} of {len(self.data)} rows")
+        else:
+            self.label_show_calculations.config(text="")
+
+    def sort_by(self, column: str):
+        if self.view is None:
+            return
+        self.view.sort(column)
+        self.refresh_view()
+
+    def filter_data(self):
+        """
+        Dodanie filtra do tabeli
+        :return:
+        """
+        if self.view is None:
+            return
+        dialog_window = AcceptFilterInputs(self, title="Filter rows", columns=self.data.columns.tolist())
+        result = dialog_window.get_result()
+        if not result:
+            return
+
+        column_name, op, value = result
+        try:
+            value = utils.parse_filter_value(self.data[column_name], op, value)
+            self.view.add_filter(column_name, op, value)
+        except (ValueError, TypeError) as e:  # TypeError: porównanie wartości różnych typów
+            messagebox.showwarning("Invalid filter", str(e), parent=self)
+            return
+        self.refresh_view()
+
+    def clear_filter(self):
+        if self.view is None:
+            return
+        self.view.clear_filters()
+        self.refresh_view()
+
+    def current_data(self) -> pd.DataFrame:
+        """
+        Dane widoczne w tabeli (po sortowaniu i filtrowaniu) po przekształceniach z pipeline
+        """
+        return self.pipeline.evaluate(self.view.frame())
+
+    def add_transform(self):
+        """
+        Dodanie kroku przekształcenia, liczonego dopiero przy analizie
+        :return:
+        """
+        if self.view is None:
+            return
+        dialog_window = AcceptTransformInputs(self, title="Add transformation", can_replace=bool(self.pipeline.steps))
+        result = dialog_window.get_result()
+        if not result:
+            return
+
+        kind, columns_text, param_text, replace_last = result
+        # parametry sprawdzane na danych wejściowych nowego kroku
+        n_steps = len(self.pipeline.steps) - 1 if replace_last else None
+        step_input = self.pipeline.evaluate(self.view.frame(), n_steps)
+        try:
+            step = pipeline.parse_step(step_input, kind, columns_text, param_text)
+        except (ValueError, KeyError) as e:
+            messagebox.showwarning("Invalid transformation", str(e), parent=self)
+            return
+        if replace_last:
+            self.pipeline.replace_last(step)
+        else:
+            self.pipeline.add(step)
+        self.show_transforms()
+
+    def undo_transform(self):
+        self.pipeline.remove_last()
+        self.show_transforms()
+
+    def clear_transforms(self):
+        self.pipeline.clear()
+        self.show_transforms()
+
+    def show_transforms(self):
+        self.label_show_calculations.config(text=f"Steps: {self.pipeline}" if self.pipeline.steps else "")
+
+    def on_close(self):
+        # zwolnienie pamięci współdzielonej przed zamknięciem
+        self.cancel_calculation(wait=True)
+        self.features.clear()
+        self.destroy()
+
+    def get_feature_matrix(self, data: pd.DataFrame, target_column: str) -> features.FeatureMatrix:
+        """
+        Macierz cech bez kolumny docelowej, z ostrzeżeniem o pominiętych kolumnach
+        Zwraca None, gdy użytkownik anulował wybór obsługi brakujących wartości
+        """
+        # sposób obsługi brakujących wartości, pytamy tylko gdy jakieś są
+        numerical_columns = [col for col in utils.get_numerical_columns(data) if col != target_column]
+        missing = "drop"
+        if data[numerical_columns].isna().to_numpy().any():
+            dialog_window = DialogWindow(self, list(features.MISSING_POLICIES), "Rows with missing values:",
+                                         "Missing values")
+            missing = dialog_window.get_column_name()
+            if not missing:
+                return None
+
+        matrix = self.features.get(data, exclude=[target_column], missing=missing, dtype=self.compute_dtype())
+        if matrix.skipped:
+            messagebox.showwarning("Non-numerical columns",
+                                   f"Skipped non-numerical columns: {', '.join(map(str, matrix.skipped))}",
+                                   parent=self)
+        return matrix
+
+    def compute_dtype(self) -> type:
+        # precyzja obliczeń wybrana w oknie
+        return np.float32 if self.float32.get() else np.float64
+
+    @staticmethod
+    def missing_note(data: pd.DataFrame, column_name: str) -> str:
+        # statystyki pomijają brakujące wartości
+        missing = utils.get_missing_count(data, column_name)
+        return f" ({missing} missing values skipped)" if missing else ""
+
+    def run_progressive(self, compute, plot, labels: np.ndarray, title: str, exponent: float):
+        """
+        Uruchomienie obliczeń na coraz większych próbkach, każdy wynik przerysowuje ten sam wykres
+        compute(positions, cancelled) - obliczenia dla wierszy o podanych pozycjach
+        plot(positions, result, ax) - rysowanie wyniku
+        """
+        import matplotlib.pyplot as plt
+
+        self.cancel_calculation()
+        fig, ax = plt.subplots(figsize=(8, 8))
+        plt.show(block=False)
+        self.progressive_run = progressive.ProgressiveRun(compute, labels, exponent=exponent)
+        self.progressive_run.start()
+        self.after(100, self.poll_progressive, self.progressive_run, plot, ax, title)
+
+    def poll_progressive(self, run: progressive.ProgressiveRun, plot, ax, title: str):
+        """
+        Odbiór wyników z wątku w tle
+        """
+        if run is not self.progressive_run or run.cancelled.is_set():
+            return
+        final = False
+        try:
+            while True:
+                positions, result, final = run.results.get_nowait()
+                plot(positions, result, ax)
+                self.label_show_calculations.config(text=f"{title}: {len(positions)} of {len(run.labels)} rows")
+        except queue.Empty:
+            pass
+
+        if run.error is not None:
+            self.progressive_run = None
+            messagebox.showwarning("Calculation failed", str(run.error), parent=self)
+            return
+        if final:
+            self.progressive_run = None
+            return
+        self.after(100, self.poll_progressive, run, plot, ax, title)
+
+    def cancel_calculation(self, wait: bool = False):
+        """
+        Przerwanie obliczeń progresywnych
+        """
+        run = self.progressive_run
+        if run is None:
+            return
+        self.progressive_run = None
+        run.cancel()
+        if wait:
+            run.join()
+        self.label_show_calculations.config(text="")
 
     @staticmethod
     def do_grid_configurations(frame: Union[tk.Frame, tk.Tk]):
@@ -330,37 +670,67 @@ class MainApplication(tk.Tk):
 
     # przypisanie funkcji do przycisków
     def load_data(self):
-        data_loaded = False
         recent_dir = os.path.dirname(self.config.get("recent_file_path"))
         # okno dialogowe do wczytania plików
         self.file_path = filedialog.askopenfilename(initialdir=recent_dir, title="Select file",
                                                     filetypes=(("csv files", "*.csv"), ("json files", "*.json"),
                                                                ("Text files", "*.txt")))
+        if not self.file_path.endswith(loaders.SUPPORTED_EXTENSIONS):
+            return
+        delimiter = None
+        if self.file_path.endswith(".txt"):
+            delimiter = self.ask_delimiter()
         # wczytanie wybranego typu plku
-        if self.file_path.endswith(".csv"):
-            self.data = pd.read_csv(self.file_path, encoding="latin-1")
-            data_loaded = True
-        elif self.file_path.endswith(".json"):
-            self.data = pd.DataFrame(load_json(self.file_path))
-            data_loaded = True
-        elif self.file_path.endswith(".txt"):
-            # okno dialogowe do wyboru separatora
-            delimiter = simpledialog.askstring(title="Select delimiter",
-                                               prompt="Enter delimiter:", initialvalue=",", parent=self)
-            # wczytanie zawartosci pliku
-            # plik txt z separatorem
-            text_list = load_text(self.file_path, delimiter)
-            self.data = pd.DataFrame(text_list[1:], columns=text_list[0])
-
-            for col in self.data.columns:  # konwersja danych na typ numerycny
-                self.data[col] = pd.to_numeric(self.data[col], errors="ignore")
-            data_loaded = True
-
-        if data_loaded:
-            self.config.set("recent_file_path", self.file_path)
-            self.config.save()
-            # pokazanie danych w tabeli
-            self.show_data()
+        self.data, report = loaders.load_file(self.file_path, delimiter)
+        self.data_loaded(report)
+
+    def load_shards(self):
+        """
+        Wczytanie danych podzielonych na wiele plików
+        :return:
+        """
+        recent_dir = os.path.dirname(self.config.get("recent_file_path"))
+        file_paths = filedialog.askopenfilenames(initialdir=recent_dir, title="Select files",
+                                                 filetypes=(("csv files", "*.csv"), ("json files", "*.json"),
+                                                            ("Text files", "*.txt")))
+        file_paths = [path for path in file_paths if path.endswith(loaders.SUPPORTED_EXTENSIONS)]
+        if not file_paths:
+            return
+        delimiter = None
+        if any(path.endswith(".txt") for path in file_paths):
+            delimiter = self.ask_delimiter()
+        source_column = None
+        if messagebox.askyesno("Source column", "Add a column with the source file name?", parent=self):
+            source_column = "source_file"
+
+        self.label_show_calculations.config(text=f"Loading {len(file_paths)} files")
+        self.update_idletasks()
+        try:
+            data, report = loaders.load_shards(file_paths, delimiter, source_column=source_column)
+        except ValueError as e:
+            self.label_show_calculations.config(text="")
+            messagebox.showwarning("Load shards", str(e), parent=self)
+            return
+        self.file_path = file_paths[0]
+        self.data = data
+        self.data_loaded(report)
+        self.label_show_calculations.config(text="")
+
+    def ask_delimiter(self) -> str:
+        # okno dialogowe do wyboru separatora
+        return simpledialog.askstring(title="Select delimiter",
+                                      prompt="Enter delimiter:", initialvalue=",", parent=self)
+
+    def data_loaded(self, report: dict):
+        self.config.set("recent_file_path", self.file_path)
+        self.config.save()
+        # pokazanie danych w tabeli
+        self.show_data()
+        # oznaczenia braków danych zamienione na NaN w kolumnach liczbowych
+        if report:
+            lines = [f"{col}: {bad}" for col, bad in report.items()]
+            messagebox.showinfo("Missing values", "Cells converted to missing values:\n" + "\n".join(lines),
+                                parent=self)
 
     def export_data(self):
         """
@@ -369,6 +739,7 @@ class MainApplication(tk.Tk):
         """
         if not isinstance(self.data, pd.DataFrame):
             return
+        data = self.current_data()
         # otwarcie okna dialogowego
         typeVar = tk.StringVar()
         file_path = filedialog.asksaveasfilename(initialdir=os.path.dirname(self.config.get("recent_file_path")),
@@ -386,17 +757,17 @@ class MainApplication(tk.Tk):
         if typeVar.get() == "csv files":
             if not file_path.endswith(".csv"):
                 file_path += ".csv"
-            self.data.to_csv(file_path, index=False)
+            data.to_csv(file_path, index=False)
             save_flag = True
         elif typeVar.get() == "json files":
             if not file_path.endswith(".json"):
                 file_path += ".json"
-            self.data.to_json(file_path, orient="records")
+            data.to_json(file_path, orient="records")
             save_flag = True
         elif typeVar.get() == "Text files":
             if not file_path.endswith(".txt"):
                 file_path += ".txt"
-            self.data.to_csv(file_path, index=False, sep="\t")
+            data.to_csv(file_path, index=False, sep="\t")
             save_flag = True
 
         if save_flag:
@@ -410,8 +781,9 @@ class MainApplication(tk.Tk):
         :return:
         """
         if isinstance(self.data, pd.DataFrame):
+            data = self.current_data()
             # pobranie nazwy kolumny
-            numerical_columns = utils.get_numerical_columns(self.data)
+            numerical_columns = utils.get_numerical_columns(data)
             if not numerical_columns:
                 messagebox.showwarning("No numerical columns", "No numerical columns found in the data", parent=self)
                 return
@@ -423,10 +795,11 @@ class MainApplication(tk.Tk):
                 return
 
             # obliczenie średniej
-            avg = utils.get_average(self.data, column_name)
+            avg = utils.get_average(data, column_name)
 
             # pokazanie średniej
-            self.label_show_calculations.config(text=f"Average of {column_name} is {avg}")
+            self.label_show_calculations.config(text=f"Average of {column_name} is {avg}"
+                                                     + self.missing_note(data, column_name))
 
     def med(self):
         """
@@ -434,8 +807,9 @@ class MainApplication(tk.Tk):
         :return:
         """
         if isinstance(self.data, pd.DataFrame):
+            data = self.current_data()
             # pobranie nazwy kolumny
-            numerical_columns = utils.get_numerical_columns(self.data)
+            numerical_columns = utils.get_numerical_columns(data)
             if not numerical_columns:
                 messagebox.showwarning("No numerical columns", "No numerical columns found in the data", parent=self)
                 return
@@ -447,10 +821,11 @@ class MainApplication(tk.Tk):
                 return
 
             # obliczenie mediany
-            med = utils.get_median(self.data, column_name)
+            med = utils.get_median(data, column_name)
 
             # pokazanie mediany
-            self.label_show_calculations.config(text=f"Median of {column_name} is {med}")
+            self.label_show_calculations.config(text=f"Median of {column_name} is {med}"
+                                                     + self.missing_note(data, column_name))
 
     def stdev(self):
         """
@@ -458,8 +833,9 @@ class MainApplication(tk.Tk):
         :return:
         """
         if isinstance(self.data, pd.DataFrame):
+            data = self.current_data()
             # pobranie nazwy kolumny
-            numerical_columns = utils.get_numerical_columns(self.data)
+            numerical_columns = utils.get_numerical_columns(data)
             if not numerical_columns:
                 messagebox.showwarning("No numerical columns", "No numerical columns found in the data", parent=self)
                 return
@@ -471,10 +847,11 @@ class MainApplication(tk.Tk):
                 return
 
             # obliczenie odchylenia standarowego
-            stdev = utils.get_standard_deviation(self.data, column_name)
+            stdev = utils.get_standard_deviation(data, column_name)
 
             # pokazanie odchylenia standardowego
-            self.label_show_calculations.config(text=f"Standard deviation of {column_name} is {stdev}")
+            self.label_show_calculations.config(text=f"Standard deviation of {column_name} is {stdev}"
+                                                     + self.missing_note(data, column_name))
 
     def get_pca(self):
         """
@@ -483,13 +860,14 @@ class MainApplication(tk.Tk):
         """
         if not isinstance(self.data, pd.DataFrame):
             return
+        data = self.current_data()
         # pobranie nazwy kolumny
-        numerical_columns = utils.get_numerical_columns(self.data)
+        numerical_columns = utils.get_numerical_columns(data)
         if not numerical_columns:
             messagebox.showwarning("No numerical columns", "No numerical columns found in the data", parent=self)
             return
-        dialog_window = AcceptPCAInputs(self, title="Enter PCA inputs", data=self.data,
-                                        columns=self.data.columns.tolist())
+        dialog_window = AcceptPCAInputs(self, title="Enter PCA inputs", data=data,
+                                        columns=data.columns.tolist())
         result = dialog_window.get_result()
         if not result:
             return
@@ -501,7 +879,27 @@ class MainApplication(tk.Tk):
         self.label_show_calculations.config(text=f"Calculating PCA for {target_column} with {n_components} components")
 
         # wyliczenie PCA
-        pca = utils.get_pca(self.data, target_column, int(n_components))
+        matrix = self.get_feature_matrix(data, target_column)
+        if matrix is None:
+            self.label_show_calculations.config(text="")
+            return
+        if self.progressive.get():
+            n_components = int(n_components)
+            target = matrix.align(data[target_column])
+            array = matrix.array
+
+            def compute(positions, cancelled):
+                scores = utils.fit_pca(array[positions], n_components)
+                if len(positions) == len(target):
+                    matrix.pca_scores = scores
+                return scores
+
+            def plot(positions, scores, ax):
+                utils.plot_pca(scores, target.iloc[positions], ax=ax)
+
+            self.run_progressive(compute, plot, target.to_numpy(), "PCA", exponent=1)
+            return
+        pca = utils.get_pca(data, target_column, int(n_components), matrix=matrix)
 
         self.label_show_calculations.config(text=f"")
 
@@ -511,13 +909,14 @@ class MainApplication(tk.Tk):
         """
         if not isinstance(self.data, pd.DataFrame):
             return
+        data = self.current_data()
         # pobranie nazwy kolumny
-        numerical_columns = utils.get_numerical_columns(self.data)
+        numerical_columns = utils.get_numerical_columns(data)
         if not numerical_columns:
             messagebox.showwarning("No numerical columns", "No numerical columns found in the data", parent=self)
             return
-        dialog_window = AcceptPCAInputs(self, title="Enter inputs for calculating Sammon", data=self.data,
-                                        columns=self.data.columns.tolist())
+        dialog_window = AcceptPCAInputs(self, title="Enter inputs for calculating Sammon", data=data,
+                                        columns=data.columns.tolist())
         result = dialog_window.get_result()
         if not result:
             return
@@ -526,17 +925,110 @@ class MainApplication(tk.Tk):
         if not target_column or not n_components:
             return
 
+        # wybór metryki lub gotowej macierzy odległości
+        dialog_window = DialogWindow(self, list(distance.METRICS) + ["precomputed"], "Select distance metric",
+                                     "Select distance")
+        metric = dialog_window.get_column_name()
+        if not metric:
+            return
+
+        distances = None
+        # pozycje wierszy macierzy odległości w kolejności tabeli (None gdy kolejność jest ta sama)
+        order = None
+        if metric == "precomputed":
+            # wiersze pliku odpowiadają wierszom wczytanych danych, filtr w przekształceniach zmienia ich zbiór
+            if any(step.kind == "filter" for step in self.pipeline.steps):
+                messagebox.showwarning("Precomputed distances",
+                                       "Precomputed distances cannot be used after a filter transformation step",
+                                       parent=self)
+                return
+            recent_dir = os.path.dirname(self.config.get("recent_file_path"))
+            file_path = filedialog.askopenfilename(initialdir=recent_dir, title="Select distance matrix",
+                                                   filetypes=(("numpy files", "*.npy"), ("csv files", "*.csv"),
+                                                              ("Text files", "*.txt")))
+            if not file_path:
+                return
+            try:
+                distances = distance.load_distance_matrix(file_path)
+            except ValueError as e:
+                messagebox.showwarning("Invalid distance matrix", str(e), parent=self)
+                return
+            if len(distances) != len(self.data):
+                messagebox.showwarning("Invalid distance matrix",
+                                       f"Distance matrix has {len(distances)} rows, data has {len(self.data)}",
+                                       parent=self)
+                return
+            # Sammon liczony jest w kolejności pliku, wynik jest potem ustawiany w kolejności tabeli;
+            # tylko filtr wymaga podmacierzy, kopiowanej blokami do nowej memmapy
+            if not self.view.is_identity():
+                order = self.view.positions()
+                if len(order) < len(distances):
+                    kept = np.sort(order)
+                    distances = distance.subset_distance_matrix(distances, kept)
+                    order = np.searchsorted(kept, order)
+
         self.label_show_calculations.config(text=f"Calculating Sammon for {target_column} with {n_components}"
                                                  f" components")
 
         # obliczenie Sammona
-        columns = self.data.columns.tolist()
-        columns.remove(target_column)
-        _data = self.data[columns]
-        _names = self.data[target_column].unique().tolist()
-        _target_data = self.data[target_column]
-        data_matrix = _data.to_numpy()
-        y, E = sammon.sammon(data_matrix, 2)  # zwraca 2 wymiarową macierz
+        dtype = self.compute_dtype()
+        _names = data[target_column].unique().tolist()
+        _target_data = data[target_column]
+        matrix = None
+        if metric == "gower":  # odległość Gowera sama pomija brakujące wartości
+            distances = distance.gower_distance_matrix(data.drop(columns=target_column), dtype=dtype)
+        elif distances is None:
+            matrix = self.get_feature_matrix(data, target_column)
+            if matrix is None:
+                self.label_show_calculations.config(text="")
+                return
+            _target_data = matrix.align(_target_data)
+            if metric != "euclidean":
+                distances = distance.compute_distance_matrix(matrix.array, metric, dtype=dtype)
+
+        if self.progressive.get():
+            array = matrix.array if matrix is not None else None
+
+            def compute(positions, cancelled):
+                if distances is not None:
+                    if len(positions) == len(distances):
+                        # ostatni etap: cała memmapa czytana blokami, bez kopii N x N w pamięci
+                        _y, _ = sammon.sammon(distances, 2, display=0, inputdist='distance', cancel=cancelled,
+                                              dtype=dtype)
+                        return _y if order is None else _y[order]
+                    rows = positions if order is None else order[positions]
+                    _y, _ = sammon.sammon(distances[np.ix_(rows, rows)], 2, display=0,
+                                          inputdist='distance', cancel=cancelled, dtype=dtype)
+                    return _y
+                _init = 'default'
+                if matrix.pca_scores is not None and matrix.pca_scores.shape[1] >= 2:
+                    _init = matrix.pca_scores[positions, :2]
+                _y, _ = sammon.sammon(array[positions], 2, display=0, init=_init, cancel=cancelled,
+                                      dtype=dtype)
+                return _y
+
+            def plot(positions, _y, ax):
+                sammon.plot_sammon(np.c_[_y, _target_data.to_numpy()[positions]], names=_names,
+                                   title="Sammon Mapping", ax=ax)
+
+            self.run_progressive(compute, plot, _target_data.to_numpy(), "Sammon", exponent=2)
+            return
+
+        try:
+            if distances is None:
+                # start z wyników PCA, jeśli były już policzone dla tych samych danych
+                init = 'default'
+                if matrix.pca_scores is not None and matrix.pca_scores.shape[1] >= 2:
+                    init = matrix.pca_scores[:, :2]
+                y, E = sammon.sammon(matrix.array, 2, init=init, dtype=dtype)  # zwraca 2 wymiarową macierz
+            else:
+                y, E = sammon.sammon(distances, 2, inputdist='distance', dtype=dtype)
+                if order is not None:
+                    y = y[order]
+        except ValueError as e:
+            self.label_show_calculations.config(text="")
+            messagebox.showwarning("Sammon mapping failed", str(e), parent=self)
+            return
 
         _plot_data = np.c_[y, _target_data]
         sammon.plot_sammon(_plot_data, names=_names, title="Sammon Mapping")
@@ -0,0 +1,175 @@
+from typing import List, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+import utils
+
+STEP_TYPES = ("select", "scale", "log", "impute", "filter")
+SCALE_METHODS = ("standard", "minmax")
+IMPUTE_STRATEGIES = ("mean", "median")
+
+
+class Step(NamedTuple):
+    """
+    Krok przekształcenia, parametry jako krotka par (nazwa, wartość), żeby krok był kluczem w cache
+    """
+    kind: str
+    params: Tuple
+
+    def get(self, name: str):
+        return dict(self.params)[name]
+
+    def __str__(self):
+        params = [f"{name}={len(value)} columns" if isinstance(value, tuple) and len(value) > 3 else f"{name}={value}"
+                  for name, value in self.params]
+        return f"{self.kind}({', '.join(params)})"
+
+
+def make_step(kind: str, **params) -> Step:
+    if kind not in STEP_TYPES:
+        raise ValueError(f"Unknown step: {kind}")
+    params = {name: tuple(value) if isinstance(value, list) else value for name, value in params.items()}
+    return Step(kind, tuple(sorted(params.items())))
+
+
+def parse_step(df: pd.DataFrame, kind: str, columns_text: str, param_text: str) -> Step:
+    """
+    Tworzenie kroku z tekstu wpisanego przez użytkownika.
+    columns_text - kolumny oddzielone przecinkami, pusty tekst to wszystkie kolumny numeryczne
+    param_text - scale: standard/minmax, log: przesunięcie, impute: mean/median, filter: "operator wartość"
+    """
+    columns = [col.strip() for col in columns_text.split(",") if col.strip()]
+    unknown = [col for col in columns if col not in df.columns]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}")
+    if not columns and kind != "filter":
+        columns = utils.get_numerical_columns(df)
+    if kind in ("scale", "log", "impute"):
+        numerical = utils.get_numerical_columns(df)
+        text = [col for col in columns if col not in numerical]
+        if text:
+            raise ValueError(f"Non-numeric columns: {', '.join(text)}")
+    param_text = param_text.strip()
+
+    if kind == "select":
+        return make_step(kind, columns=columns)
+    if kind == "scale":
+        method = param_text or "standard"
+        if method not in SCALE_METHODS:
+            raise ValueError(f"Scale method must be one of: {', '.join(SCALE_METHODS)}")
+        return make_step(kind, columns=columns, method=method)
+    if kind == "log":
+        return make_step(kind, columns=columns, offset=float(param_text or 0))
+    if kind == "impute":
+        strategy = param_text or "mean"
+        if strategy not in IMPUTE_STRATEGIES:
+            raise ValueError(f"Impute strategy must be one of: {', '.join(IMPUTE_STRATEGIES)}")
+        return make_step(kind, columns=columns, strategy=strategy)
+    if kind == "filter":
+        if len(columns) != 1:
+            raise ValueError("Filter expects exactly one column")
+        op, _, value = param_text.partition(" ")
+        if op not in utils.FILTER_OPERATORS:
+            raise ValueError(f"Filter operator must be one of: {', '.join(utils.FILTER_OPERATORS)}")
+        return make_step(kind, column=columns[0], op=op, value=utils.parse_filter_value(df[columns[0]], op, value))
+    raise ValueError(f"Unknown step: {kind}")
+
+
+def apply_step(df: pd.DataFrame, step: Step) -> pd.DataFrame:
+    """
+    Wykonanie jednego kroku, zwraca nową ramkę (wejście nie jest modyfikowane)
+    """
+    if step.kind == "select":
+        return df[list(step.get("columns"))]
+    if step.kind == "filter":
+        mask = utils.filter_mask(df[step.get("column")], step.get("op"), step.get("value"))
+        return df[mask].reset_index(drop=True)
+
+    columns = list(step.get("columns"))
+    # kopia, bo przy copy-on-write to_numpy może zwrócić widok tylko do odczytu
+    values = df[columns].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+    if step.kind == "scale":
+        if step.get("method") == "standard":
+            center = np.nanmean(values, axis=0)
+            spread = np.nanstd(values, axis=0)
+        else:
+            center = np.nanmin(values, axis=0)
+            spread = np.nanmax(values, axis=0) - center
+        spread[spread == 0] = 1.0
+        values = (values - center) / spread
+    elif step.kind == "log":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.log(values + step.get("offset"))
+        values[~np.isfinite(values)] = np.nan  # log z wartości niedodatnich
+    elif step.kind == "impute":
+        fill = np.nanmean(values, axis=0) if step.get("strategy") == "mean" else np.nanmedian(values, axis=0)
+        rows, cols = np.nonzero(np.isnan(values))
+        values[rows, cols] = fill[cols]
+
+    out = df.copy(deep=False)
+    out[columns] = values
+    return out
+
+
+class Pipeline:
+    """
+    Leniwy ciąg przekształceń wykonywany dopiero przy evaluate().
+    Wyniki pośrednie są zapamiętywane według prefiksu kroków, więc zmiana
+    ostatniego kroku przelicza tylko ten krok.
+    """
+
+    def __init__(self):
+        self.steps: List[Step] = []
+        self._source = None
+        self._cache = {}
+
+    def add(self, step: Step):
+        self.steps.append(step)
+        self._forget()
+
+    def replace_last(self, step: Step):
+        removed = tuple(self.steps)
+        self.steps[-1] = step
+        self._forget(removed)
+
+    def remove_last(self):
+        if self.steps:
+            removed = tuple(self.steps)
+            self.steps.pop()
+            self._forget(removed)
+
+    def clear(self):
+        self.steps = []
+        self._cache = {}
+
+    def _forget(self, removed: Tuple = ()):
+        """
+        Usunięcie z cache wyników, które nie są prefiksami bieżących kroków.
+        Zostaje tylko ostatnio usunięta gałąź removed (np. do ponownego dodania cofniętego kroku).
+        """
+        current = tuple(self.steps)
+        self._cache = {key: result for key, result in self._cache.items()
+                       if key == current[:len(key)] or key == removed[:len(key)]}
+
+    def __str__(self):
+        return " -> ".join(str(step) for step in self.steps)
+
+    def evaluate(self, df: pd.DataFrame, n_steps: int = None) -> pd.DataFrame:
+        """
+        Wynik przekształceń dla ramki df, ponownie liczone są tylko kroki po najdłuższym zapamiętanym prefiksie
+        n_steps - liczba pierwszych kroków do wykonania (domyślnie wszystkie)
+        """
+        if df is not self._source:
+            self._source = df
+            self._cache = {}
+        steps = self.steps if n_steps is None else self.steps[:n_steps]
+
+        start = len(steps)
+        while start > 0 and tuple(steps[:start]) not in self._cache:
+            start -= 1
+        result = self._cache[tuple(steps[:start])] if start else df
+        for k in range(start, len(steps)):
+            result = apply_step(result, steps[k])
+            self._cache[tuple(steps[:k + 1])] = result
+        return result
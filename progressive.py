@@ -0,0 +1,103 @@
+import queue
+import threading
+import time
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+
+def stratified_sample(labels: np.ndarray, size: int, random_state=None) -> np.ndarray:
+    """
+    Losowa próbka dokładnie size pozycji wierszy z zachowaniem proporcji klas.
+    Każda klasa dostaje co najmniej jeden wiersz, chyba że klas jest więcej niż size
+    (np. kolumna identyfikatorów jako cel), wtedy próbka jest tylko proporcjonalna.
+    """
+    n = len(labels)
+    if size >= n:
+        return np.arange(n)
+    rng = np.random.default_rng(random_state)
+    codes, _ = pd.factorize(labels, use_na_sentinel=False)
+    counts = np.bincount(codes)
+    # klasy, którym z proporcji wypada mniej niż jeden wiersz, dostają dokładnie jeden
+    # (o ile klas nie jest więcej niż size), reszta próbki jest dzielona proporcjonalnie
+    fixed = np.zeros(len(counts), dtype=bool)
+    while True:
+        quota = np.where(fixed, 1.0, counts * (size - fixed.sum()) / counts[~fixed].sum())
+        small = ~fixed & (quota < 1)
+        if len(counts) > size or not small.any():
+            break
+        fixed |= small
+    allocation = np.floor(quota).astype(np.int64)
+    # brakujące do size wiersze dostają klasy o największej części ułamkowej (remisy losowo)
+    shuffled = rng.permutation(len(counts))
+    order = shuffled[np.argsort((allocation - quota)[shuffled], kind="stable")]
+    allocation[order[:size - allocation.sum()]] += 1
+
+    # losowa permutacja pogrupowana po klasach, z każdej klasy bierzemy pierwsze allocation[k] wierszy
+    permutation = rng.permutation(n)
+    permutation = permutation[np.argsort(codes[permutation], kind="stable")]
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    sorted_codes = codes[permutation]
+    rank = np.arange(n) - starts[sorted_codes]
+    return np.sort(permutation[rank < allocation[sorted_codes]])
+
+
+class ProgressiveRun:
+    """
+    Obliczenia na coraz większych próbkach w wątku w tle.
+    Pierwsza próbka ma calibration_size wierszy, druga jest dobierana tak, żeby zmieścić się
+    w budżecie czasu (koszt ~ N ** exponent), kolejne rosną growth razy aż do pełnych danych.
+    Wyniki (pozycje wierszy, wynik, czy_ostatni) trafiają do kolejki results.
+    """
+
+    def __init__(self, compute: Callable, labels: np.ndarray, budget: float = 0.5, exponent: float = 2,
+                 growth: int = 4, calibration_size: int = 100, random_state=None):
+        self.compute = compute
+        self.labels = labels
+        self.budget = budget
+        self.exponent = exponent
+        self.growth = growth
+        self.calibration_size = calibration_size
+        self.random_state = random_state
+        self.results = queue.Queue()
+        self.cancelled = threading.Event()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def join(self, timeout: float = None):
+        self._thread.join(timeout)
+
+    def next_size(self, size: int, elapsed: float, first: bool) -> int:
+        if first:
+            # największa próbka mieszcząca się w budżecie
+            budget_size = size * (self.budget / max(elapsed, 1e-6)) ** (1 / self.exponent)
+            return int(max(budget_size, 2 * size))
+        return size * self.growth
+
+    def _run(self):
+        n_total = len(self.labels)
+        size = min(self.calibration_size, n_total)
+        first = True
+        try:
+            while not self.cancelled.is_set():
+                positions = stratified_sample(self.labels, size, self.random_state)
+                start = time.perf_counter()
+                result = self.compute(positions, self.cancelled)
+                elapsed = time.perf_counter() - start
+                if self.cancelled.is_set():
+                    break
+                final = size >= n_total
+                self.results.put((positions, result, final))
+                if final:
+                    break
+                size = min(self.next_size(size, elapsed, first), n_total)
+                first = False
+        except Exception as e:
+            self.error = e
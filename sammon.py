@@ -1,6 +1,81 @@
 from typing import List
 
-def sammon(x, n, display=2, inputdist='raw', maxhalves=20, maxiter=500, tolfun=1e-9, init='default'):
+
+def init_economy_svd(x, n):
+    """Leading n principal coordinates of x from an economy SVD.
+    Only the N x p left singular vectors are formed, never the N x N ones.
+    """
+    import numpy as np
+
+    UU, DD, _ = np.linalg.svd(x, full_matrices=False)
+    return UU[:, :n] * DD[:n]
+
+
+def init_randomized_svd(x, n, n_oversamples=10, n_iter=4, random_state=None):
+    """Leading n principal coordinates of x from a randomized truncated SVD
+    (Halko, Martinsson & Tropp).  Costs O(N * p * (n + n_oversamples)).
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(random_state)
+    k = min(n + n_oversamples, min(x.shape))
+    Q = x @ rng.normal(size=(x.shape[1], k))
+    # power iterations sharpen the spectrum, re-orthonormalising each time
+    for _ in range(n_iter):
+        Q, _ = np.linalg.qr(Q)
+        Q, _ = np.linalg.qr(x.T @ Q)
+        Q = x @ Q
+    Q, _ = np.linalg.qr(Q)
+    UU, DD, _ = np.linalg.svd(Q.T @ x, full_matrices=False)
+    return (Q @ UU[:, :n]) * DD[:n]
+
+
+def init_cmdscale(D, n):
+    """Leading n coordinates of classical MDS on the distance matrix D."""
+    from cmdscale import cmdscale
+
+    y, e = cmdscale(D, dtype=D.dtype, k=n)
+    return y[:, :n]
+
+
+def distance_matrix(x, dtype=None, block_size=1024):
+    """Euclidean distances between the rows of x, computed in row blocks
+    straight into an N x N array of the requested dtype (so float32 mode
+    never holds a float64 copy of the whole matrix).
+    """
+    import numpy as np
+    from scipy.spatial.distance import cdist
+
+    N = x.shape[0]
+    D = np.empty((N, N), dtype=dtype or np.float64)
+    for start in range(0, N, block_size):
+        D[start:start + block_size] = cdist(x[start:start + block_size], x)
+    return D
+
+
+def _gradient_rows(dinv, Dinv, y_rows, y2_rows, y, y2, one):
+    """Rows of the Sammon gradient g and Hessian diagonal H for the points
+    y_rows, given their rows of 1/d and 1/D.
+    """
+    import numpy as np
+
+    delta = dinv - Dinv
+    deltaone = np.dot(delta, one)
+    g = np.dot(delta, y) - (y_rows * deltaone)
+    dinv3 = dinv ** 3
+    H = np.dot(dinv3, y2) - deltaone - 2 * y_rows * np.dot(dinv3, y) + y2_rows * np.dot(dinv3, one)
+    return g, H
+
+
+# initialisations computed from the raw data x
+INITIALISERS = {
+    'pca': init_economy_svd,
+    'randomized': init_randomized_svd,
+}
+
+
+def sammon(x, n, display=2, inputdist='raw', maxhalves=20, maxiter=500, tolfun=1e-9, init='default',
+           cancel=None, dtype=None, block_size=1024):
     import numpy as np
     from scipy.spatial.distance import cdist
 
@@ -21,78 +96,159 @@ def sammon(x, n, display=2, inputdist='raw', maxhalves=20, maxiter=500, tolfun=1
        maxhalves      - maximum number of step halvings
        input          - {'raw','distance'} if set to 'distance', X is 
                         interpreted as a matrix of pairwise distances.
+                        If X is a memmap (see distance.py) it is never
+                        loaded whole: the stress, gradient and Hessian are
+                        accumulated over row blocks of X, holding
+                        O(block_size * N) memory at a time.  Every stress
+                        evaluation then re-reads X, so this trades speed
+                        for memory.  Other arrays are copied into memory.
        display        - 0 to 2. 0 least verbose, 2 max verbose.
-       init           - {'pca', 'cmdscale', random', 'default'}
+       init           - {'pca', 'randomized', 'cmdscale', random', 'default'}
                         default is 'pca' if input is 'raw', 
                         'msdcale' if input is 'distance'
+                        'pca' uses an economy SVD, 'randomized' a
+                        randomized truncated SVD (see INITIALISERS).
+                        May also be a callable f(x, n) or an N x n
+                        array of starting coordinates, e.g. the scores
+                        of a PCA already fitted on x.
+       cancel         - optional threading.Event, when set the
+                        optimisation stops and the current map is returned.
+       dtype          - float64 (default) or float32.  In float32 mode all
+                        N x N matrices and the map are float32, the stress
+                        is still summed in float64 and tolfun is raised to
+                        at least float32 machine epsilon.
+       block_size     - rows per block when computing distances and, for a
+                        memory-mapped X, when reading X.
     The default options are retrieved by calling sammon(x) with no
     parameters.
     """
 
+    dtype = np.dtype(dtype or np.float64)
+    tolfun = max(tolfun, np.finfo(dtype).eps)
+
+    # init may be an array of coordinates, only compare it if it is a name
+    named_init = init if isinstance(init, str) else None
+
     # Create distance matrix unless given by parameters
     if inputdist == 'distance':
         D = x
-        if init == 'default':
-            init = 'cmdscale'
+        if named_init == 'default':
+            init = named_init = 'cmdscale'
     else:
-        D = cdist(x, x)
-        if init == 'default':
-            init = 'pca'
+        D = distance_matrix(x, dtype)
+        if named_init == 'default':
+            init = named_init = 'pca'
 
-    if inputdist == 'distance' and init == 'pca':
-        raise ValueError("Cannot use init == 'pca' when inputdist == 'distance'")
+    if inputdist == 'distance' and (named_init in INITIALISERS or callable(init)):
+        raise ValueError("Cannot use init == '%s' when inputdist == 'distance'" % init)
 
     if np.count_nonzero(np.diagonal(D)) > 0:
         raise ValueError("The diagonal of the dissimilarity matrix must be zero")
 
     # Remaining initialisation
     N = x.shape[0]
-    scale = 0.5 / D.sum()
-    D = D + np.eye(N)
-
-    if np.count_nonzero(D <= 0) > 0:
-        raise ValueError("Off-diagonal dissimilarities must be strictly positive")
-
-    Dinv = 1 / D
-    if init == 'pca':
-        [UU, DD, _] = np.linalg.svd(x)
-        y = UU[:, :n] * DD[:n]
-    elif init == 'cmdscale':
-        from cmdscale import cmdscale
-        y, e = cmdscale(D)
-        y = y[:, :n]
-    else:
-        y = np.random.normal(0.0, 1.0, [N, n])
-    one = np.ones([N, n])
-    d = cdist(y, y) + np.eye(N)
-    dinv = 1. / d
-    delta = D - d
-    E = ((delta ** 2) * Dinv).sum()
+    scale = 0.5 / D.sum(dtype=np.float64)
+    # a memory-mapped distance matrix is only ever read in row blocks
+    blocked = inputdist == 'distance' and isinstance(D, np.memmap)
+    one = np.ones([N, n], dtype=dtype)
 
-    # Get on with it
-    for i in range(maxiter):
+    def rows(start):
+        # block of D with the diagonal set to 1, and its reciprocal
+        Db = np.array(D[start:start + block_size], dtype=dtype)
+        Db[np.arange(len(Db)), np.arange(start, start + len(Db))] = 1
+        return Db, 1 / Db
 
+    def map_rows(y, start):
+        # block of the map distances with the diagonal set to 1
+        d = np.asarray(cdist(y[start:start + block_size], y), dtype=dtype)
+        d[np.arange(len(d)), np.arange(start, start + len(d))] = 1
+        return d
+
+    def stress(y):
+        # the stress is always accumulated in float64; the dense path also
+        # returns 1 / d for the next gradient
+        if not blocked:
+            d = distance_matrix(y, dtype)
+            np.fill_diagonal(d, 1)
+            delta = D - d
+            return ((delta ** 2) * Dinv).sum(dtype=np.float64), 1 / d
+        E = 0.0
+        for start in range(0, N, block_size):
+            Db, Dinv_b = rows(start)
+            delta = Db - map_rows(y, start)
+            E += ((delta ** 2) * Dinv_b).sum(dtype=np.float64)
+        return E, None
+
+    def direction(y, dinv):
         # Compute gradient, Hessian and search direction (note it is actually
         # 1/4 of the gradient and Hessian, but the step size is just the ratio
         # of the gradient and the diagonal of the Hessian so it doesn't
         # matter).
-        delta = dinv - Dinv
-        deltaone = np.dot(delta, one)
-        g = np.dot(delta, y) - (y * deltaone)
-        dinv3 = dinv ** 3
         y2 = y ** 2
-        H = np.dot(dinv3, y2) - deltaone - np.dot(2, y) * np.dot(dinv3, y) + y2 * np.dot(dinv3, one)
-        s = -g.flatten(order='F') / np.abs(H.flatten(order='F'))
+        if not blocked:
+            g, H = _gradient_rows(dinv, Dinv, y, y2, y, y2, one)
+        else:
+            g = np.empty_like(y)
+            H = np.empty_like(y)
+            for start in range(0, N, block_size):
+                stop = start + block_size
+                _, Dinv_b = rows(start)
+                dinv_b = 1 / map_rows(y, start)
+                g[start:stop], H[start:stop] = _gradient_rows(dinv_b, Dinv_b, y[start:stop], y2[start:stop],
+                                                              y, y2, one)
+        # coordinates whose Hessian term cancelled to exactly zero (more
+        # likely in float32) are not moved instead of producing inf/nan
+        H = np.abs(H.flatten(order='F'))
+        return np.divide(-g.flatten(order='F'), H, out=np.zeros_like(H), where=H != 0)
+
+    if blocked:
+        for start in range(0, N, block_size):
+            if np.count_nonzero(rows(start)[0] <= 0) > 0:
+                raise ValueError("Off-diagonal dissimilarities must be strictly positive")
+    else:
+        if inputdist == 'distance':
+            D = np.array(D, dtype=dtype)  # the only in-memory copy of the input
+        np.fill_diagonal(D, 1)
+
+        if np.count_nonzero(D <= 0) > 0:
+            raise ValueError("Off-diagonal dissimilarities must be strictly positive")
+
+        Dinv = 1 / D
+
+    if isinstance(init, np.ndarray):
+        if init.shape != (N, n):
+            raise ValueError("Initial configuration must have shape (%d, %d)" % (N, n))
+        y = init
+    elif callable(init):
+        y = init(x, n)
+    elif named_init in INITIALISERS:
+        y = INITIALISERS[named_init](x, n)
+    elif named_init == 'cmdscale' and blocked:
+        y = init_cmdscale(D, n)
+    elif named_init == 'cmdscale':
+        # classical MDS needs the true (zero) diagonal, a diagonal of ones
+        # swamps small dissimilarities such as cosine distances
+        np.fill_diagonal(D, 0)
+        y = init_cmdscale(D, n)
+        np.fill_diagonal(D, 1)
+    else:
+        y = np.random.normal(0.0, 1.0, [N, n])
+    y = np.array(y, dtype=dtype)
+    E, dinv = stress(y)
+
+    # Get on with it
+    for i in range(maxiter):
+        if cancel is not None and cancel.is_set():
+            break
+
+        s = direction(y, dinv)
         y_old = y
 
         # Use step-halving procedure to ensure progress is made
         for j in range(maxhalves):
             s_reshape = np.reshape(s, (-1, n), order='F')
             y = y_old + s_reshape
-            d = cdist(y, y) + np.eye(N)
-            dinv = 1 / d
-            delta = D - d
-            E_new = ((delta ** 2) * Dinv).sum()
+            E_new, dinv = stress(y)
             if E_new < E:
                 break
             else:
@@ -122,7 +278,7 @@ def sammon(x, n, display=2, inputdist='raw', maxhalves=20, maxiter=500, tolfun=1
     return [y, E]
 
 
-def plot_sammon(y, names: List[str], title=None):
+def plot_sammon(y, names: List[str], title=None, ax=None):
     """
     Plot the Sammon mapping.
 
@@ -131,12 +287,18 @@ def plot_sammon(y, names: List[str], title=None):
     :param y : array_like
     :param title : str, optional, title of the plot
     :param names: list of str
+    :param ax : matplotlib Axes, optional, existing plot to redraw in place
     """
     import matplotlib.pyplot as plt
 
+    redraw = ax is not None
+    if redraw:
+        ax.clear()
+    else:
+        fig = plt.figure()
+        ax = fig.add_subplot(111)
+
     # Plot the data
-    fig = plt.figure()
-    ax = fig.add_subplot(111)
     for name in names:
         filter_data = y[y[:, 2] == name]
         ax.scatter(filter_data[:, 0], filter_data[:, 1], label=name)
@@ -144,4 +306,7 @@ def plot_sammon(y, names: List[str], title=None):
     ax.set_ylabel('y')
     if title is not None:
         ax.set_title(title)
-    plt.show()
+    if redraw:
+        ax.figure.canvas.draw_idle()
+    else:
+        plt.show()
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import distance
+import sammon
+
+
+def distances_for(frame, metric):
+    if metric == "gower":
+        return distance.gower_distance_matrix(frame, block_size=32)
+    return distance.compute_distance_matrix(frame.to_numpy(dtype=np.float64), metric, block_size=32)
+
+
+@pytest.mark.parametrize("metric", distance.METRICS)
+def test_metric_runs_through_sammon(complete_data, metric):
+    D = distances_for(complete_data, metric)
+    assert D.shape == (len(complete_data), len(complete_data))
+    assert np.count_nonzero(np.diagonal(D)) == 0
+    np.testing.assert_allclose(D, D.T, atol=1e-12)
+
+    y, E = sammon.sammon(D, 2, display=0, inputdist="distance", maxiter=20)
+    assert y.shape == (len(complete_data), 2)
+    assert np.isfinite(y).all()
+    assert np.isfinite(E)
+
+
+def test_condensed_matrix_is_expanded(complete_data, tmp_path):
+    from scipy.spatial.distance import cdist, pdist
+
+    x = complete_data.to_numpy(dtype=np.float64)
+    path = str(tmp_path / "condensed.npy")
+    np.save(path, pdist(x))
+    np.testing.assert_allclose(distance.load_distance_matrix(path), cdist(x, x))
+
+
+def test_leading_eigenpairs_match_dense_cmdscale(complete_data):
+    from cmdscale import cmdscale
+
+    D = distances_for(complete_data, "euclidean")
+    y, e = cmdscale(np.array(D))
+    y_k, e_k = cmdscale(D, block_size=32, k=2)
+    np.testing.assert_allclose(e_k, e[:2], rtol=1e-8)
+    # each dimension is only determined up to its sign
+    np.testing.assert_allclose(np.abs(y_k), np.abs(y[:, :2]), atol=1e-8)
+
+
+def test_memmap_sammon_matches_in_memory(complete_data):
+    D = distances_for(complete_data, "euclidean")
+    assert isinstance(D, np.memmap)
+    y0 = np.random.default_rng(0).normal(size=(len(complete_data), 2))
+
+    y, E = sammon.sammon(np.array(D), 2, display=0, inputdist="distance", init=y0, maxiter=20)
+    y_blocked, E_blocked = sammon.sammon(D, 2, display=0, inputdist="distance", init=y0, maxiter=20,
+                                         block_size=32)
+    np.testing.assert_allclose(y_blocked, y, atol=1e-10)
+    assert E_blocked == pytest.approx(E, rel=1e-10)
+
+
+def test_whitened_mahalanobis_matches_cdist(complete_data):
+    from scipy.spatial.distance import cdist
+
+    x = complete_data.to_numpy(dtype=np.float64)
+    VI = np.linalg.pinv(np.cov(x, rowvar=False))
+    D = distance.compute_distance_matrix(x, "mahalanobis", block_size=32)
+    np.testing.assert_allclose(D, cdist(x, x, "mahalanobis", VI=VI), rtol=1e-8)
+
+
+def test_subset_keeps_requested_order(complete_data):
+    D = distances_for(complete_data, "euclidean")
+    positions = np.array([5, 2, 90, 0, 41])
+    subset = distance.subset_distance_matrix(D, positions, block_size=2)
+    assert isinstance(subset, np.memmap)
+    np.testing.assert_array_equal(subset, np.asarray(D)[np.ix_(positions, positions)])
@@ -0,0 +1,65 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import features
+
+
+def attached_values(spec):
+    shm, array = features.attach(spec)
+    try:
+        return array.copy()
+    finally:
+        del array
+        shm.close()
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(rng.normal(size=(50, 3)), columns=["a", "b", "c"])
+
+
+def test_evicted_matrix_is_closed(df, monkeypatch):
+    closed = []
+    close = features.FeatureMatrix.close
+
+    def recording_close(matrix):
+        closed.append(matrix)
+        close(matrix)
+
+    monkeypatch.setattr(features.FeatureMatrix, "close", recording_close)
+    cache = features.FeatureCache(max_size=2)
+    first = cache.get(df, columns=["a"])
+    cache.get(df, columns=["b"])
+    assert cache.get(df, columns=["a"]) is first  # trafienie przesuwa macierz na koniec kolejki
+    cache.get(df, columns=["c"])
+    assert [matrix.columns for matrix in closed] == [["b"]]
+    assert first.array is not None
+    cache.clear()
+    assert len(closed) == 3
+
+
+def test_view_survives_clear(df):
+    cache = features.FeatureCache()
+    matrix = cache.get(df, standardize=True)
+    view = matrix.array[:, :2]
+    expected = view.copy()
+    cache.clear()
+    assert matrix.array is None
+    np.testing.assert_array_equal(view, expected)
+
+
+def test_attach_in_subprocess(df):
+    cache = features.FeatureCache()
+    matrix = cache.get(df, dtype=np.float32)
+    try:
+        with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context("spawn")) as executor:
+            values = executor.submit(attached_values, matrix.spec).result()
+        assert values.dtype == np.float32
+        np.testing.assert_array_equal(values, matrix.array)
+    finally:
+        cache.clear()
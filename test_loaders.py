@@ -0,0 +1,62 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import loaders
+
+
+def test_missing_markers_become_nan():
+    series, bad = loaders.coerce_column(pd.Series(["1", "NA", " 3 ", ".", None]))
+    assert pd.api.types.is_float_dtype(series.dtype)
+    np.testing.assert_array_equal(series.isna().to_numpy(), [False, True, False, True, True])
+    assert bad == 2
+
+
+def test_text_cells_keep_column_as_text():
+    original = pd.Series(["A1", "2", "3", "4"])
+    series, bad = loaders.coerce_column(original)
+    assert series is original
+    assert bad == 0
+
+
+@pytest.fixture
+def shards(tmp_path):
+    paths = [tmp_path / "a.csv", tmp_path / "b.txt", tmp_path / "c.json"]
+    paths[0].write_text("id,a,b,c\n1,1,2,10\n2,3,4,20\n")
+    # "." w kolumnie a, kolumna c z samymi brakami jest w tym pliku tekstowa, brak kolumny b
+    paths[1].write_text("id,a,c,kind\n3,5,NA,z\n4,.,NA,w\n")
+    paths[2].write_text(json.dumps({"feeds": [{"id": 5, "a": 6, "b": 7, "c": 30, "kind": "v"}]}))
+    return [str(path) for path in paths]
+
+
+def test_shards_are_reconciled(shards):
+    df, report = loaders.load_shards(shards, ",", source_column="source_file")
+    assert df.columns.tolist() == ["id", "a", "b", "c", "kind", "source_file"]
+    assert df["id"].dtype == np.int64
+    # kolumna int, której brakuje w jednym pliku, dostaje NaN
+    assert df["b"].dtype == np.float64
+    np.testing.assert_array_equal(df["b"].isna().to_numpy(), [False, False, True, True, False])
+    # kolumna mieszana (liczby i tekst z brakami) jest ponownie konwertowana na liczby
+    assert df["c"].dtype == np.float64
+    assert df["c"].isna().sum() == 2
+    assert df["kind"].tolist()[2:] == ["z", "w", "v"]
+    assert isinstance(df["source_file"].dtype, pd.CategoricalDtype)
+    assert df["source_file"].tolist() == ["a.csv", "a.csv", "b.txt", "b.txt", "c.json"]
+    assert report == {"a": 1, "c": 2}
+
+
+def test_source_column_must_be_new(shards):
+    with pytest.raises(ValueError, match="id"):
+        loaders.load_shards(shards, ",", source_column="id")
+
+
+@pytest.mark.parametrize("name", ["shard.csv", "shard.txt"])
+def test_missing_markers_are_counted_for_csv_and_txt(tmp_path, name):
+    path = tmp_path / name
+    path.write_text("a,b,name\n1,.,x\n2,NA,\n3,4,z\n")
+    df, report = loaders.load_file(str(path), ",")
+    assert report == {"b": 2}
+    assert df["b"].dtype == np.float64
+    assert df["name"].tolist() == ["x", "", "z"]
@@ -0,0 +1,81 @@
+import pandas as pd
+import pytest
+
+import pipeline
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"a": [1.0, 2.0, None, 4.0], "b": [10, 20, 30, 40], "name": ["w", "x", "y", "z"]})
+
+
+@pytest.fixture
+def apply_calls(monkeypatch):
+    calls = []
+    apply_step = pipeline.apply_step
+
+    def counting_apply_step(frame, step):
+        calls.append(step)
+        return apply_step(frame, step)
+
+    monkeypatch.setattr(pipeline, "apply_step", counting_apply_step)
+    return calls
+
+
+def make_pipeline():
+    steps = pipeline.Pipeline()
+    steps.add(pipeline.make_step("impute", columns=["a"], strategy="mean"))
+    steps.add(pipeline.make_step("scale", columns=["a", "b"], method="standard"))
+    steps.add(pipeline.make_step("log", columns=["b"], offset=1.0))
+    return steps
+
+
+def test_evaluate_reuses_cached_result(df, apply_calls):
+    steps = make_pipeline()
+    result = steps.evaluate(df)
+    assert len(apply_calls) == 3
+    assert steps.evaluate(df) is result
+    assert len(apply_calls) == 3
+
+
+def test_replacing_last_step_recomputes_only_that_step(df, apply_calls):
+    steps = make_pipeline()
+    first = steps.evaluate(df)
+    step = pipeline.make_step("log", columns=["b"], offset=2.0)
+    steps.replace_last(step)
+    second = steps.evaluate(df)
+    assert apply_calls[3:] == [step]
+    assert second is not first
+
+    # cofnięcie ostatniego kroku to odczyt z cache
+    steps.remove_last()
+    steps.evaluate(df)
+    assert len(apply_calls) == 4
+
+
+def test_new_source_frame_clears_cache(df, apply_calls):
+    steps = make_pipeline()
+    steps.evaluate(df)
+    steps.evaluate(df.copy())
+    assert len(apply_calls) == 6
+
+
+@pytest.mark.parametrize("kind", ["scale", "log", "impute"])
+def test_numeric_steps_reject_text_columns(df, kind):
+    with pytest.raises(ValueError, match="name"):
+        pipeline.parse_step(df, kind, "a, name", "")
+
+
+def test_cache_keeps_only_current_and_last_removed_branch(df):
+    steps = make_pipeline()
+    steps.evaluate(df)
+    for offset in (2.0, 3.0, 4.0):
+        steps.replace_last(pipeline.make_step("log", columns=["b"], offset=offset))
+        steps.evaluate(df)
+    # prefiksy bieżących kroków (3) i ostatnio zastąpiony krok (offset=3.0)
+    assert len(steps._cache) == 4
+
+    steps.remove_last()
+    assert len(steps._cache) == 3
+    steps.clear()
+    assert steps._cache == {}
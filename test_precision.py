@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+from scipy.spatial.distance import pdist
+
+import cmdscale
+import features
+import sammon
+
+
+@pytest.fixture
+def feature_cache():
+    cache = features.FeatureCache()
+    yield cache
+    cache.clear()
+
+
+def test_feature_matrix_float32(data, feature_cache):
+    matrix64 = feature_cache.get(data, exclude=["death"], standardize=True)
+    matrix32 = feature_cache.get(data, exclude=["death"], standardize=True, dtype=np.float32)
+    assert matrix32 is not matrix64
+    assert matrix32.array.dtype == np.float32
+    assert matrix32.array.flags["C_CONTIGUOUS"]
+    np.testing.assert_allclose(matrix32.array, matrix64.array, rtol=1e-5, atol=1e-5)
+
+
+def test_cmdscale_float32_matches_float64(data, feature_cache):
+    x = feature_cache.get(data, exclude=["death"], standardize=True).array
+    D = sammon.distance_matrix(x)
+    Y64, e64 = cmdscale.cmdscale(D)
+    Y32, e32 = cmdscale.cmdscale(D.astype(np.float32), dtype=np.float32)
+
+    assert Y32.dtype == np.float32
+    np.testing.assert_allclose(e32[:2], e64[:2], rtol=1e-4)
+    # kolumny są wyznaczone z dokładnością do znaku
+    for k in range(2):
+        sign = np.sign(Y64[:, k] @ Y32[:, k])
+        assert np.abs(sign * Y32[:, k] - Y64[:, k]).max() < 1e-3 * np.abs(Y64[:, k]).max()
+
+
+def test_sammon_float32_stress_close_to_float64(data, feature_cache):
+    x = feature_cache.get(data, exclude=["death"], standardize=True).array
+    y64, E64 = sammon.sammon(x, 2, display=0)
+    y32, E32 = sammon.sammon(x, 2, display=0, dtype=np.float32)
+
+    assert y32.dtype == np.float32
+    assert isinstance(E32, np.float64)  # stres sumowany w float64
+    assert abs(E32 - E64) / E64 < 1e-2
+    assert np.corrcoef(pdist(y64), pdist(y32))[0, 1] > 0.95
+
+
+def test_sammon_float32_distance_input(data, feature_cache):
+    x = feature_cache.get(data, exclude=["death"], standardize=True).array
+    D = sammon.distance_matrix(x, np.float32)
+    y, E = sammon.sammon(D, 2, display=0, inputdist="distance", dtype=np.float32, maxiter=50)
+    assert y.dtype == np.float32
+    assert np.isfinite(y).all()
+    assert np.isfinite(E)
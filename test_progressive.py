@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+import progressive
+
+
+@pytest.mark.parametrize("n_classes", [3, 40, 500])
+def test_sample_has_requested_size(n_classes):
+    rng = np.random.default_rng(0)
+    labels = rng.integers(0, n_classes, size=1000)
+    sample = progressive.stratified_sample(labels, 100, random_state=0)
+    assert len(sample) == 100
+    assert len(np.unique(sample)) == 100
+    if n_classes <= 100:  # każda klasa reprezentowana
+        assert set(labels[sample]) == set(labels)
+
+
+def test_high_cardinality_target_is_not_the_whole_dataset():
+    # np. kolumna identyfikatorów wybrana jako cel
+    sample = progressive.stratified_sample(np.arange(735), 100, random_state=0)
+    assert len(sample) <= 100
+    assert sample.max() > 100  # nie pierwsze wiersze, tylko losowe
+
+
+def test_sample_keeps_class_proportions():
+    labels = np.repeat([0, 1, 2], [700, 200, 100])
+    sample = progressive.stratified_sample(labels, 100, random_state=0)
+    np.testing.assert_array_equal(np.bincount(labels[sample]), [70, 20, 10])
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+import sammon
+
+
+@pytest.fixture
+def x():
+    rng = np.random.default_rng(0)
+    # wyraźnie różne wartości osobliwe, żeby kierunki były dobrze określone
+    return rng.normal(size=(80, 6)) * np.array([10.0, 6.0, 3.0, 1.0, 0.5, 0.1])
+
+
+def assert_equal_up_to_sign(a, b, **kwargs):
+    signs = np.sign(np.sum(a * b, axis=0))
+    np.testing.assert_allclose(a * signs, b, **kwargs)
+
+
+def test_economy_svd_matches_full_svd(x):
+    UU, DD, _ = np.linalg.svd(x)
+    assert_equal_up_to_sign(sammon.init_economy_svd(x, 2), UU[:, :2] * DD[:2], atol=1e-10)
+
+
+def test_randomized_svd_close_to_economy(x):
+    economy = sammon.init_economy_svd(x, 2)
+    randomized = sammon.init_randomized_svd(x, 2, random_state=0)
+    assert_equal_up_to_sign(randomized, economy, atol=1e-6 * np.abs(economy).max())
+
+
+def test_init_array_with_wrong_shape_is_rejected(x):
+    with pytest.raises(ValueError, match="shape"):
+        sammon.sammon(x, 2, display=0, init=np.zeros((len(x), 3)))
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def df():
+    return pd.DataFrame({"a": [3.0, 1.0, None, 2.0, 5.0],
+                         "name": ["c", None, "a", "b", "a"]})
+
+
+def test_argsort_is_cached(df):
+    view = utils.DataView(df)
+    order = view.argsort("a")
+    view.sort("a")
+    view.positions()
+    assert view.argsort("a") is order
+
+
+def test_second_sort_reverses_order(df):
+    view = utils.DataView(df)
+    view.sort("a")
+    ascending = view.positions()
+    view.sort("a")
+    assert not view.ascending
+    np.testing.assert_array_equal(view.positions(), ascending[::-1])
+
+
+def test_filters_are_combined_with_and(df):
+    view = utils.DataView(df)
+    view.add_filter("a", ">", 1.0)
+    np.testing.assert_array_equal(view.positions(), [0, 3, 4])
+    view.add_filter("name", "==", "a")
+    np.testing.assert_array_equal(view.positions(), [4])
+    assert view.frame()["a"].tolist() == [5.0]
+
+    view.clear_filters()
+    assert view.frame() is df
+
+
+@pytest.mark.parametrize("op, value, expected", [
+    ("==", "a", [False, False, True, False, True]),
+    ("!=", "a", [True, True, False, True, False]),
+    ("<", "b", [False, False, True, False, True]),
+    ("between", ("a", "b"), [False, False, True, True, True]),
+])
+def test_missing_values_match_only_not_equal(df, op, value, expected):
+    np.testing.assert_array_equal(utils.filter_mask(df["name"], op, value), expected)
+
+
+def test_numeric_filter_value_is_parsed(df):
+    assert utils.parse_filter_value(df["a"], ">", " 2 ") == 2.0
+    assert utils.parse_filter_value(df["a"], "between", "1, 3") == (1.0, 3.0)
+    with pytest.raises(ValueError):
+        utils.parse_filter_value(df["a"], "between", "1")
+
+
+def test_frame_is_source_without_sort_or_filter(df):
+    view = utils.DataView(df)
+    assert view.is_identity()
+    assert view.frame() is df
+    view.sort("name")
+    assert view.frame() is not df
+    assert view.frame() is view.frame()  # widok liczony raz
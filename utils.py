@@ -1,4 +1,6 @@
 ﻿import os
+
+import numpy as np
 import pandas as pd
 
 
@@ -6,7 +8,15 @@ def get_numerical_columns(df):
     """
     Zwraca liste nazw kolumn
     """
-    return [col for col in df.columns if (df[col].dtype in ['int64', 'float64'])]
+    return [col for col in df.columns
+            if pd.api.types.is_numeric_dtype(df[col].dtype) and not pd.api.types.is_bool_dtype(df[col].dtype)]
+
+
+def get_missing_count(df: pd.DataFrame, col: str) -> int:
+    """
+    Zwraca liczbę brakujących wartości w kolumnie
+    """
+    return int(df[col].isna().sum())
 
 
 def get_average(df: pd.DataFrame, col: str):
@@ -37,33 +47,188 @@ def get_standard_deviation(df: pd.DataFrame, col: str):
     return df[col].std()
 
 
-def get_pca(df: pd.DataFrame, target_col: str, n_components: int):
+def get_pca(df: pd.DataFrame, target_col: str, n_components: int, matrix=None):
     """
     zwraca główną składową tabeli danych
+    matrix - gotowa macierz cech (features.FeatureMatrix) bez kolumny docelowej
     """
-    from sklearn.decomposition import PCA
+    import features
     __target_labels = df[target_col].unique()
     __target_labels.sort()
     __target_labels = __target_labels.tolist()
 
+    feature_cache = None
+    if matrix is None:
+        feature_cache = features.FeatureCache()
+        matrix = feature_cache.get(df, exclude=[target_col])
+
+    principal_components = fit_pca(matrix.array, n_components)
+    if feature_cache is not None:
+        feature_cache.clear()
+    else:
+        matrix.pca_scores = principal_components
+
+    plot_pca(principal_components, matrix.align(df[target_col]))
+    return principal_components
+
+
+def fit_pca(x: np.ndarray, n_components: int) -> np.ndarray:
+    """
+    Zwraca współrzędne głównych składowych dla macierzy cech
+    """
+    from sklearn.decomposition import PCA
     _pca = PCA(n_components=n_components)
-    _pca.fit(df.drop(target_col, axis=1))
-    principal_components = _pca.transform(df.drop(target_col, axis=1))
-    __column_names = [f"PC_{i}" for i in range(1, n_components + 1)]
+    return _pca.fit_transform(x)
 
-    _principal_df = pd.DataFrame(principal_components, columns=__column_names)
-    _principal_df[target_col] = df[target_col]
 
-    # tworzenie wykresu dla główntch składowych
+def plot_pca(principal_components: np.ndarray, target: pd.Series, ax=None):
+    """
+    tworzenie wykresu dla główntch składowych
+    ax - istniejący wykres (matplotlib Axes) do przerysowania w miejscu
+    """
     import matplotlib.pyplot as plt
     import seaborn as sns
 
-    plt.figure(figsize=(8, 8))
+    target_col = target.name
+    __column_names = [f"PC_{i}" for i in range(1, principal_components.shape[1] + 1)]
+
+    _principal_df = pd.DataFrame(principal_components, columns=__column_names)
+    _principal_df[target_col] = target.to_numpy()
+
+    redraw = ax is not None
+    if redraw:
+        ax.clear()
+    else:
+        plt.figure(figsize=(8, 8))
     sns.set(style="white")
     sns.set(font_scale=1.5)
     sns.set_color_codes("pastel")
-    sns.scatterplot(x=__column_names[0], y=__column_names[1], hue=target_col, data=_principal_df)
-    plt.show()
+    sns.scatterplot(x=__column_names[0], y=__column_names[1], hue=target_col, data=_principal_df, ax=ax)
+    if redraw:
+        ax.figure.canvas.draw_idle()
+    else:
+        plt.show()
+
+
+FILTER_OPERATORS = ("==", "!=", "<", "<=", ">", ">=", "between")
+
+
+def parse_filter_value(series: pd.Series, op: str, value: str):
+    """
+    Konwersja tekstu wpisanego przez użytkownika na wartość(i) predykatu
+    """
+    parts = [part.strip() for part in value.split(",")] if op == "between" else [value.strip()]
+    if op == "between" and len(parts) != 2:
+        raise ValueError("Range filter expects two values: low, high")
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        parts = [float(part) for part in parts]
+    return tuple(parts) if op == "between" else parts[0]
+
+
+def filter_mask(series: pd.Series, op: str, value) -> np.ndarray:
+    """
+    Zwraca maskę logiczną wierszy spełniających predykat
+    Brakujące wartości spełniają tylko predykat "!="
+    """
+    present = series.notna().to_numpy()
+    values = series.to_numpy()[present]
+    if op == "==":
+        mask = values == value
+    elif op == "!=":
+        mask = values != value
+    elif op == "<":
+        mask = values < value
+    elif op == "<=":
+        mask = values <= value
+    elif op == ">":
+        mask = values > value
+    elif op == ">=":
+        mask = values >= value
+    elif op == "between":
+        low, high = value
+        mask = (values >= low) & (values <= high)
+    else:
+        raise ValueError(f"Unknown filter operator: {op}")
+    result = np.full(len(series), op == "!=", dtype=bool)
+    result[present] = np.asarray(mask, dtype=bool)
+    return result
+
+
+class DataView:
+    """
+    Posortowany i przefiltrowany widok ramki danych.
+    Indeksy sortowania są liczone raz na kolumnę, a filtry to maski logiczne,
+    więc zmiana widoku nie wymaga sortowania ani kopiowania całej ramki.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.sort_column = None
+        self.ascending = True
+        self.filters = []
+        self._argsort_cache = {}
+        self._mask = np.ones(len(df), dtype=bool)
+        self._frame = None
+
+    def argsort(self, col: str) -> np.ndarray:
+        """
+        Zwraca (zapamiętany) stabilny indeks sortowania kolumny
+        """
+        if col not in self._argsort_cache:
+            values = self.df[col].to_numpy()
+            try:
+                order = np.argsort(values, kind="stable")
+            except TypeError:  # kolumny z mieszanymi typami
+                order = np.argsort(values.astype(str), kind="stable")
+            self._argsort_cache[col] = order
+        return self._argsort_cache[col]
+
+    def sort(self, col: str, ascending: bool = None):
+        """
+        Sortowanie po kolumnie, ponowne wywołanie odwraca kierunek
+        """
+        if ascending is None:
+            ascending = not self.ascending if col == self.sort_column else True
+        self.sort_column = col
+        self.ascending = ascending
+        self._frame = None
+
+    def add_filter(self, col: str, op: str, value):
+        """
+        Dodanie predykatu, zawęża aktualny widok bez przeliczania poprzednich
+        """
+        self._mask &= filter_mask(self.df[col], op, value)
+        self.filters.append((col, op, value))
+        self._frame = None
+
+    def clear_filters(self):
+        self.filters = []
+        self._mask = np.ones(len(self.df), dtype=bool)
+        self._frame = None
+
+    def positions(self) -> np.ndarray:
+        """
+        Pozycje widocznych wierszy w kolejności wyświetlania
+        """
+        if self.sort_column is None:
+            return np.flatnonzero(self._mask)
+        order = self.argsort(self.sort_column)
+        if not self.ascending:
+            order = order[::-1]
+        return order[self._mask[order]]
+
+    def is_identity(self) -> bool:
+        return self.sort_column is None and not self.filters
+
+    def frame(self) -> pd.DataFrame:
+        """
+        Ramka danych odpowiadająca widokowi, używana przez statystyki, PCA, Sammona i eksport
+        """
+        if self.is_identity():
+            return self.df
+        if self._frame is None:
+            self._frame = self.df.iloc[self.positions()].reset_index(drop=True)
+        return self._frame
 
 
 class Config: